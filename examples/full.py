@@ -13,22 +13,37 @@ SSID = "YOUR_WIFI_SSID"
 PASSWORD = "YOUR_WIFI_PASSWORD"
 LED_PIN = 2  # Default onboard LED (ESP32 usually)
 
+# Lazily-built Pin singleton: constructing machine.Pin touches peripheral
+# registers and allocates, so do it once instead of on every request
+_LED = None
+
+
+def _led():
+    global _LED
+    if _LED is None:
+        _LED = machine.Pin(LED_PIN, machine.Pin.OUT)
+    return _LED
+
 
 # Setup Network
-def connect_wifi(ssid, password):
+async def connect_wifi(ssid, password):
+    """Connect to WiFi without blocking the event loop.
+
+    Polls with await asyncio.sleep_ms instead of time.sleep so other
+    startup tasks (server accept loop, GC) keep running while waiting.
+    """
     wlan = network.WLAN(network.STA_IF)
     wlan.active(True)
     if not wlan.isconnected():
         print(f"Connecting to {ssid}...")
         wlan.connect(ssid, password)
 
-        # Wait for connection with timeout
-        timeout = 10
-        start = time.time()
+        # Wait for connection with timeout (10s)
+        start = time.ticks_ms()
         while not wlan.isconnected():
-            if time.time() - start > timeout:
+            if time.ticks_diff(time.ticks_ms(), start) > 10000:
                 return False
-            time.sleep(1)
+            await asyncio.sleep_ms(250)
 
     print("Network Config:", wlan.ifconfig())
     return True
@@ -69,10 +84,8 @@ async def led_control(req):
         return Response.error("Missing 'state' in JSON body", 400)
 
     try:
-        # Initialize pin only when needed or globally if preferred
-        pin = machine.Pin(LED_PIN, machine.Pin.OUT)
         value = 1 if state in (1, True, "on") else 0
-        pin.value(value)
+        _led().value(value)
         return Response.json({"led": "on" if value else "off"})
     except Exception as e:
         return Response.error(f"Hardware error: {str(e)}", 500)
@@ -80,18 +93,44 @@ async def led_control(req):
 
 @app.websocket("/ws/echo")
 async def ws_echo(ws):
-    """Simple WebSocket Echo Server"""
+    """WebSocket Echo Server with pipelined receive/send.
+
+    Receive and send run as separate coroutines so the socket keeps
+    reading new frames while a previous send is still draining (on a
+    slow radio, strictly serializing recv -> send halves throughput).
+    uasyncio has no Queue, so a list plus an Event stands in for one.
+    """
     print("WS Connected")
     await ws.send("Welcome to MicroServer WS")
 
-    try:
+    queue = []
+    ready = asyncio.Event()
+
+    async def rx():
         while True:
             msg = await ws.receive()
+            queue.append(msg)  # None signals end-of-stream to tx
+            ready.set()
             if msg is None:
-                break  # Connection closed
+                break
 
-            # Echo back
-            await ws.send(f"Echo: {msg}")
+    async def tx():
+        while True:
+            while not queue:
+                ready.clear()
+                await ready.wait()
+            msg = queue.pop(0)
+            if msg is None:
+                break
+            # Plain concatenation of a constant prefix: skips the f-string
+            # formatting machinery and keeps binary frames bytes-native
+            if isinstance(msg, bytes):
+                await ws.send(b"Echo: " + msg)
+            else:
+                await ws.send("Echo: " + msg)
+
+    try:
+        await asyncio.gather(rx(), tx())
     except Exception as e:
         print("WS Error:", e)
     finally:
@@ -104,7 +143,7 @@ async def ws_echo(ws):
 
 async def main():
     # 1. Connect to WiFi
-    if not connect_wifi(SSID, PASSWORD):
+    if not await connect_wifi(SSID, PASSWORD):
         print("Failed to connect to WiFi")
         return
 
@@ -113,11 +152,14 @@ async def main():
     # Run the server loop
     asyncio.create_task(app.run())
 
-    # 3. Request Loop for periodic tasks (e.g. status report, cleanup)
-    while True:
-        await asyncio.sleep(60)
-        gc.collect()  # Periodically clean memory
-        # print(f"Heartbeat: free mem {gc.mem_free()}")
+    # 3. Allocation-threshold GC instead of a periodic heartbeat task:
+    # collect once now, then auto-collect whenever a quarter of the free
+    # heap has been allocated. No coroutine left waking up just for GC.
+    gc.collect()
+    gc.threshold(gc.mem_free() // 4)
+
+    # Park main forever (the server task keeps the loop alive)
+    await asyncio.Event().wait()
 
 
 if __name__ == "__main__":
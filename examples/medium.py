@@ -46,16 +46,20 @@ async def sum_numbers(req):
 async def stream_file(req):
     """Stream a large file from flash storage."""
 
-    # Generator to read file in chunks
+    # Generator to read file in chunks.
+    # readinto() reuses one preallocated buffer for the whole transfer
+    # instead of allocating a fresh bytes object per chunk (less GC churn).
     def file_chunker():
+        buf = bytearray(CHUNK_SIZE)
+        mv = memoryview(buf)
         try:
             # Adjust path as needed for your device
             with open("big.txt", "rb") as f:
                 while True:
-                    data = f.read(CHUNK_SIZE)
-                    if not data:
+                    n = f.readinto(buf)
+                    if not n:
                         break
-                    yield data
+                    yield mv[:n]
         except OSError:
             pass  # Stream ends empty if file not found
 
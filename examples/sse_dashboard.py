@@ -6,6 +6,8 @@ Acesse: http://192.168.1.100/
 """
 
 import time
+from array import array
+
 from http import Response
 
 import uasyncio as asyncio
@@ -15,29 +17,63 @@ from microserver import MicroServer
 
 app = MicroServer(port=80)
 
+# Modo demo: liga o simulador de vendas em background. Em produção deixe
+# False — é uma coroutine perpétua (RNG, sell(), prints) que invalida o
+# cache SSE à toa e ocupa o scheduler
+DEMO_MODE = True
+
+
+# Relógio barato: time.time() pode tocar o driver de RTC a cada chamada;
+# deriva o timestamp de ticks_ms (leitura de registrador) a partir de uma
+# âncora de relógio de parede capturada uma vez no import
+_T0_WALL = time.time()
+_T0_MONO = time.ticks_ms()
+
+
+def _now():
+    return _T0_WALL + time.ticks_diff(time.ticks_ms(), _T0_MONO) / 1000
+
+
+# Tamanho do histórico de vendas (potência de 2 para índice com máscara)
+_RING_SIZE = 32
+
+# Catálogo fixo em layout SoA: nomes num tuple + contagens num array('H')
+# (2 bytes por item vs ~dezenas de bytes por entrada de dict)
+_STOCK_NAMES = ("Coca-Cola", "Água", "Chips", "Chocolate")
+_STOCK_IDX = {name: i for i, name in enumerate(_STOCK_NAMES)}
+
 
 # Estado global da vending machine
 class VendingState:
     def __init__(self):
         self.sales_today = 0
         self.total_revenue = 0.0
-        self.products_sold = []
-        self.stock = {"Coca-Cola": 10, "Água": 15, "Chips": 8, "Chocolate": 12}
+        # Histórico de vendas em ring buffer fixo: RAM limitada, sem
+        # crescimento sem fim até OOM como uma list.append teria
+        self._ring = [None] * _RING_SIZE
+        self._ring_i = 0
+        self._qty = array("H", (10, 15, 8, 12))
         self.last_sale = None
-        self.start_time = time.time()
+        self.start_time = _now()
+        # Contador de revisão: incrementa a cada venda, permite que
+        # consumidores (SSE) saibam se algo mudou sem re-serializar
+        self._rev = 0
 
     def sell(self, product, price):
         """Registra venda de produto"""
-        if product in self.stock and self.stock[product] > 0:
+        i = _STOCK_IDX.get(product)
+        if i is not None and self._qty[i] > 0:
             self.sales_today += 1
             self.total_revenue += price
-            self.stock[product] -= 1
+            self._qty[i] -= 1
             self.last_sale = {
                 "product": product,
                 "price": price,
-                "timestamp": time.time(),
+                "timestamp": _now(),
             }
-            self.products_sold.append(self.last_sale)
+            self._ring[self._ring_i] = self.last_sale
+            self._ring_i = (self._ring_i + 1) & (_RING_SIZE - 1)
+            self._rev += 1
             return True
         return False
 
@@ -46,20 +82,23 @@ class VendingState:
         return {
             "sales_today": self.sales_today,
             "total_revenue": round(self.total_revenue, 2),
-            "stock": self.stock,
+            # dict só é materializado aqui, na emissão JSON (rara após o
+            # cache por revisão); o estado quente fica no array
+            "stock": {n: self._qty[i] for i, n in enumerate(_STOCK_NAMES)},
             "last_sale": self.last_sale,
-            "uptime": int(time.time() - self.start_time),
-            "timestamp": time.time(),
+            "uptime": int(_now() - self.start_time),
+            "timestamp": _now(),
         }
 
 
 state = VendingState()
 
+# Frames SSE coalescidos por yield (amortiza overhead TCP por push)
+_SSE_BATCH = 4
 
-@app.get("/")
-async def index(req):
-    """Dashboard HTML com EventSource (SSE)"""
-    html = """
+
+# HTML pré-codificado uma única vez no import (evita alocar str + bytes a cada GET /)
+_INDEX_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -373,8 +412,13 @@ async def index(req):
     </script>
 </body>
 </html>
-    """
-    return Response.html(html)
+    """.encode()
+
+
+@app.get("/")
+async def index(req):
+    """Dashboard HTML com EventSource (SSE)"""
+    return Response.html(_INDEX_HTML)
 
 
 @app.get("/api/events")
@@ -385,14 +429,33 @@ async def sse_events(req):
     """
 
     async def event_stream():
-        """Generator que yielda eventos SSE"""
+        """Generator que yielda eventos SSE (em lotes de _SSE_BATCH frames)"""
+        # Pre-bind como locais: cada resolução global/atributo no loop
+        # custa um load de dict no MicroPython
+        _dumps = ujson.dumps
+        _sleep = asyncio.sleep
+        _stats = state.get_stats
+        buf = bytearray()
+        last_rev = -1
+        last_payload = b""
         while True:
-            # Pegar estatísticas atuais
-            stats = state.get_stats()
-
-            yield f"data: {ujson.dumps(stats)}\n\n".encode()
-
-            await asyncio.sleep(1)
+            # Acumula N frames num único yield: para payloads pequenos o
+            # overhead TCP por push domina, então menos writes = menos bytes
+            # na rede (custo: latência de até 1s por frame dentro do lote)
+            buf[:] = b""
+            for _ in range(_SSE_BATCH):
+                # Só re-serializa quando houve venda; na maioria dos ticks
+                # nada mudou e o frame em cache é reenviado sem alocar
+                if state._rev != last_rev:
+                    last_rev = state._rev
+                    last_payload = b"data: " + _dumps(_stats()).encode() + b"\n\n"
+                buf += last_payload
+                await _sleep(1.0 / _SSE_BATCH)
+
+            # memoryview evita copiar o lote para um bytes novo; o server
+            # escreve e drena o frame antes do generator continuar, então
+            # o buffer pode ser reutilizado com segurança
+            yield memoryview(buf)
 
     return Response.sse(event_stream())
 
@@ -419,10 +482,32 @@ async def sell_product(req):
         return Response.error(str(e), 500)
 
 
+# Cache curto do JSON de /api/stats: absorve rajadas de polling de
+# vários clientes sem re-serializar dados idênticos
+_STATS_TTL_MS = 200
+_stats_cache = [0, b""]  # [ticks_ms da geração, payload]
+
+
 @app.get("/api/stats")
 async def get_stats(req):
     """API REST para pegar estatísticas (sem SSE)"""
-    return Response.json(state.get_stats())
+    now = time.ticks_ms()
+    if _stats_cache[1] and time.ticks_diff(now, _stats_cache[0]) < _STATS_TTL_MS:
+        return Response(_stats_cache[1], content_type="application/json")
+
+    payload = ujson.dumps(state.get_stats()).encode()
+    _stats_cache[0] = now
+    _stats_cache[1] = payload
+    return Response(payload, content_type="application/json")
+
+
+# Catálogo fixo do simulador (construído uma vez, não por iteração)
+_SIM_PRODUCTS = (
+    ("Coca-Cola", 5.00),
+    ("Água", 3.00),
+    ("Chips", 4.50),
+    ("Chocolate", 6.00),
+)
 
 
 async def auto_sales_simulator():
@@ -432,19 +517,14 @@ async def auto_sales_simulator():
     """
     import urandom
 
-    products = [
-        ("Coca-Cola", 5.00),
-        ("Água", 3.00),
-        ("Chips", 4.50),
-        ("Chocolate", 6.00),
-    ]
-
     await asyncio.sleep(5)
 
     while True:
-        await asyncio.sleep(urandom.randint(5, 15))
+        # getrandbits é uma chamada C direta; randint passa por wrapper
+        # Python que normaliza ranges arbitrários
+        await asyncio.sleep(5 + urandom.getrandbits(4))  # 5..20s
 
-        product, price = products[urandom.randint(0, len(products) - 1)]
+        product, price = _SIM_PRODUCTS[urandom.getrandbits(2)]  # len == 4
 
         if state.sell(product, price):
             print(f"🛒 Venda automática: {product} - R$ {price:.2f}")
@@ -462,6 +542,11 @@ async def main():
     print("💡 Abra o dashboard no browser para ver atualizações em tempo real!")
     print()
 
+    # Simulador só existe em demo: fora dele, nenhuma task extra no
+    # scheduler e o cache SSE fica válido indefinidamente
+    if DEMO_MODE:
+        asyncio.create_task(auto_sales_simulator())
+
     await app.run()
 
 
@@ -7,28 +7,44 @@ import time
 from http import Response
 
 import uasyncio as asyncio
-import ujson
 
 from microserver import MicroServer
 
 app = MicroServer(port=80)
 
+# Relógio barato: time.time() pode tocar o driver de RTC; deriva o
+# timestamp de ticks_ms a partir de uma âncora capturada no import
+_T0_WALL = time.time()
+_T0_MONO = time.ticks_ms()
+
+
+def _now():
+    return _T0_WALL + time.ticks_diff(time.ticks_ms(), _T0_MONO) / 1000
+
+
+# Frames SSE coalescidos por yield (amortiza overhead TCP por push)
+_SSE_BATCH = 4
+
+# Schema do payload é fixo: template bytes é bem mais barato que
+# ujson.dumps (sem walk de dict nem dispatch por tipo a cada tick)
+_EVENT_TMPL = b'data: {"temperature":%d,"humidity":%d,"timestamp":%d}\n\n'
+
 
 def get_sensor_data():
     """Simula leitura de sensores"""
     import urandom
 
+    # getrandbits + máscara: uma chamada C por valor, sem o wrapper
+    # Python de randint que normaliza ranges arbitrários
     return {
-        "temperature": 20 + urandom.randint(0, 10),
-        "humidity": 50 + urandom.randint(0, 30),
-        "timestamp": time.time(),
+        "temperature": 20 + (urandom.getrandbits(4) & 0x0F),
+        "humidity": 50 + (urandom.getrandbits(5) & 0x1F),
+        "timestamp": _now(),
     }
 
 
-@app.get("/")
-async def index(req):
-    """Página HTML com SSE"""
-    html = """
+# HTML pré-codificado uma única vez no import (evita alocar str + bytes a cada GET /)
+_INDEX_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -91,8 +107,13 @@ async def index(req):
     </script>
 </body>
 </html>
-    """
-    return Response.html(html)
+    """.encode()
+
+
+@app.get("/")
+async def index(req):
+    """Página HTML com SSE"""
+    return Response.html(_INDEX_HTML)
 
 
 @app.get("/events")
@@ -100,11 +121,27 @@ async def events(req):
     """SSE endpoint - atualiza a cada 2 segundos"""
 
     async def stream():
+        # Pre-bind como locais: cada resolução global no loop custa um
+        # load de dict no MicroPython
+        _sleep = asyncio.sleep
+        _read = get_sensor_data
+        buf = bytearray()
         while True:
-            data = get_sensor_data()
-
-            yield f"data: {ujson.dumps(data)}\n\n".encode()
-            await asyncio.sleep(2)
+            # Acumula N leituras num único yield para amortizar o overhead
+            # TCP por push (payloads pequenos, headers dominam)
+            buf[:] = b""
+            for _ in range(_SSE_BATCH):
+                data = _read()
+                buf += _EVENT_TMPL % (
+                    data["temperature"],
+                    data["humidity"],
+                    int(data["timestamp"]),
+                )
+                await _sleep(2.0 / _SSE_BATCH)
+
+            # memoryview evita copiar o lote para um bytes novo; o server
+            # drena o frame antes do generator continuar
+            yield memoryview(buf)
 
     return Response.sse(stream())
 
@@ -1,6 +1,6 @@
 import json
 
-from utils import unquote
+from utils import parse_query
 
 _PHRASES = {
     # 1xx: Informational
@@ -74,6 +74,42 @@ _PHRASES = {
 }
 
 
+# Status lines completas pré-codificadas no import: escrever uma resposta
+# vira um lookup + referência de bytes em vez de f-string + encode
+_STATUS_LINES = {
+    code: ("HTTP/1.1 %d %s\r\n" % (code, phrase)).encode()
+    for code, phrase in _PHRASES.items()
+}
+
+# Content-types constantes compartilhados pelas factories. Singletons:
+# toda Response criada pelas factories referencia o mesmo objeto str, e a
+# comparação no writer resolve por identidade antes de comparar chars
+_CT_JSON = "application/json"
+_CT_HTML = "text/html"
+_CT_PLAIN = "text/plain"
+_CT_SSE = "text/event-stream"
+
+# Linhas de header pré-codificadas para os content-types usados pelas
+# factories de Response (evita f-string + encode a cada resposta)
+_CT_LINES = {
+    _CT_JSON: b"Content-Type: application/json\r\n",
+    _CT_HTML: b"Content-Type: text/html\r\n",
+    _CT_PLAIN: b"Content-Type: text/plain\r\n",
+    _CT_SSE: b"Content-Type: text/event-stream\r\n",
+}
+
+
+# Métodos canônicos: o get() devolve sempre o mesmo objeto str para os
+# métodos conhecidos, então comparações e lookups de rota downstream
+# resolvem por identidade (MicroPython não tem sys.intern; o dict cumpre
+# o mesmo papel de canonicalização)
+_METHODS = {m: m for m in ("GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD")}
+
+# Sentinela para "body ainda não parseado": None é resultado válido de
+# json.loads (body b"null"), então não serve como marcador
+_UNSET = object()
+
+
 class Request:
     __slots__ = (
         "method",
@@ -89,81 +125,154 @@ class Request:
     def __init__(
         self, method: str, path: str, headers: dict, ip: str, query_params: dict = None
     ):
-        self.method: str = method
+        self.method: str = _METHODS.get(method, method)
         self.headers: dict = headers
         self.ip: str = ip
         self.body: bytes = None
-        self._json = None
-        self.path_params: dict = {}
+        self._json = _UNSET
+        # None até o router casar uma rota parametrizada: a maioria das
+        # rotas não tem parâmetros e não paga a alocação do dict
+        self.path_params: dict = None
 
         if "?" in path:
             self.path, query_string = path.split("?", 1)
-            self.query_params: dict = query_params or {}
-
-            start = 0
-            qlen = len(query_string)
-            while start < qlen:
-                end = query_string.find("&", start)
-                if end == -1:
-                    end = qlen
-
-                pair = query_string[start:end]
-                if "=" in pair:
-                    eq_pos = pair.find("=")
-                    key = unquote(pair[:eq_pos])
-                    value = unquote(pair[eq_pos + 1 :])
-                    self.query_params[key] = value
-                elif pair:
-                    self.query_params[unquote(pair)] = ""
-
-                start = end + 1
+            self.query_params: dict = parse_query(query_string, query_params or {})
         else:
             self.path: str = path
             self.query_params: dict = query_params or {}
 
     @property
     def json(self) -> dict:
-        if self._json is None and self.body:
+        # Um único parse por request: depois do primeiro acesso o hot
+        # path é só a comparação de identidade (inclusive para body
+        # b"null" ou malformado, que antes re-entravam no try/except)
+        if self._json is _UNSET:
+            body = self.body
+            # Body lido via readinto chega como memoryview sobre o buffer
+            # da conexão; json.loads exige str/bytes
+            if isinstance(body, memoryview):
+                body = bytes(body)
             try:
-                self._json = json.loads(self.body)
+                self._json = json.loads(body) if body else None
             except ValueError:
-                pass
+                self._json = None
         return self._json
 
 
 class Response:
-    __slots__ = ("body", "status", "headers", "content_type")
+    __slots__ = (
+        "body",
+        "status",
+        "_headers",
+        "content_type",
+        "_hdr_bytes",
+        "_streaming",
+        "_prebuilt",
+        "_raw_headers",
+    )
 
     def __init__(
-        self, body: object, status: int = 200, content_type: str = "application/json"
+        self, body: object, status: int = 200, content_type: str = _CT_JSON
     ):
         self.body = body
         self.status: int = status
-        self.headers: dict = {}
+        # Lazy: a maioria das respostas não tem headers custom, então o
+        # dict só é alocado no primeiro add_header/acesso (menos pressão
+        # de GC por request no ESP32)
+        self._headers = None
+        # Bloco de headers custom já codificado, memoizado no primeiro
+        # envio: Responses reutilizadas (singletons de módulo) não pagam
+        # encode de novo. add_header invalida; depois do primeiro envio a
+        # resposta deve ser tratada como imutável
+        self._hdr_bytes = None
+        # Resposta inteira (do Content-Type ao body) já codificada, usada
+        # pelo precache de estáticos: o writer só prepende as linhas
+        # variáveis (Date/Connection) e escreve o blob direto
+        self._prebuilt = None
+        # Bloco de headers já em bytes anexado pelo writer depois dos
+        # headers custom: middlewares com headers fixos (ex.: CORS) anexam
+        # um blob pré-codificado em vez de 3-4 inserções de dict + encode
+        self._raw_headers = None
         self.content_type: str = content_type
+        # Decidido uma vez na construção: o writer lê o slot em vez de
+        # rodar até três hasattr por resposta. dict/list ficam de fora
+        # (viram JSON no envio); generators/iteradores são streaming
+        self._streaming = (
+            body is not None
+            and not isinstance(body, (bytes, bytearray, memoryview, str, dict, list))
+            and (
+                hasattr(body, "__aiter__")
+                or hasattr(body, "__next__")
+                or hasattr(body, "__iter__")
+            )
+        )
+
+    def _clone(self) -> "Response":
+        """Cópia rasa para respostas singleton (404 canned, precache).
+
+        body e _prebuilt são compartilhados (imutáveis na prática); os
+        slots de header começam zerados, então middlewares podem anexar
+        headers por request sem mutar o objeto compartilhado nem vazar
+        estado entre requests/instâncias do servidor.
+        """
+        resp = Response.__new__(Response)
+        resp.body = self.body
+        resp.status = self.status
+        resp.content_type = self.content_type
+        resp._headers = None
+        resp._hdr_bytes = None
+        resp._prebuilt = self._prebuilt
+        resp._raw_headers = None
+        resp._streaming = self._streaming
+        return resp
+
+    @property
+    def headers(self) -> dict:
+        h = self._headers
+        if h is None:
+            h = self._headers = {}
+        return h
 
     def add_header(self, key: str, value: str):
-        self.headers[key] = value
+        h = self._headers
+        if h is None:
+            h = self._headers = {}
+        h[key] = value
+        self._hdr_bytes = None
 
     @classmethod
     def json(cls, data: dict, status: int = 200) -> "Response":
-        """Factory para respostas JSON."""
-        return cls(json.dumps(data), status=status, content_type="application/json")
+        """Factory para respostas JSON.
+
+        Para dict/list a serialização é adiada: o valor é guardado como
+        body e o writer faz um único dumps+encode no momento do envio
+        (evita serializar de novo quando middlewares reescrevem a
+        resposta). Os demais valores JSON (str, int, tuple, bool, None)
+        são serializados aqui mesmo — o writer só difere dict/list e os
+        trataria como body cru (str sem aspas, tuple como streaming).
+        """
+        if not isinstance(data, (dict, list)):
+            data = json.dumps(data, separators=(",", ":")).encode()
+        return cls(data, status=status, content_type=_CT_JSON)
 
     @classmethod
-    def html(cls, content: str, status: int = 200) -> "Response":
-        """Factory para respostas HTML."""
-        return cls(content, status=status, content_type="text/html")
+    def html(cls, content, status: int = 200) -> "Response":
+        """Factory para respostas HTML (body vira bytes na construção)."""
+        if isinstance(content, str):
+            content = content.encode()
+        return cls(content, status=status, content_type=_CT_HTML)
 
     @classmethod
-    def plain(cls, content: str, status: int = 200) -> "Response":
-        """Factory para respostas de texto plano."""
-        return cls(content, status=status, content_type="text/plain")
+    def plain(cls, content, status: int = 200) -> "Response":
+        """Factory para respostas de texto plano (body vira bytes na construção)."""
+        if isinstance(content, str):
+            content = content.encode()
+        return cls(content, status=status, content_type=_CT_PLAIN)
 
     @classmethod
     def redirect(cls, location: str) -> "Response":
         """Helper para redirecionamento."""
-        resp = cls("", status=302)
+        resp = cls(b"", status=302)
         resp.add_header("Location", location)
         return resp
 
@@ -173,7 +282,7 @@ class Response:
         return cls.json({"error": message, "code": status}, status=status)
 
     @classmethod
-    def stream(cls, generator, content_type: str = "text/plain") -> "Response":
+    def stream(cls, generator, content_type: str = _CT_PLAIN) -> "Response":
         """Factory para respostas em streaming (generator)."""
         return cls(generator, status=200, content_type=content_type)
 
@@ -209,7 +318,7 @@ class Response:
             - Reconexão automática pelo browser
             - Formato: "data: content\\n\\n" (obrigatório 2x \\n)
         """
-        response = cls(generator, status=200, content_type="text/event-stream")
+        response = cls(generator, status=200, content_type=_CT_SSE)
         response.add_header("Cache-Control", "no-cache")
         response.add_header("X-Accel-Buffering", "no")  # Nginx compatibility
         return response
@@ -19,6 +19,17 @@ SSID = "SEU_WIFI"
 PASSWORD = "SUA_SENHA"
 LED_PIN = 2  # Geralmente o LED embutido no ESP32
 
+# Pin construído uma única vez (lazy): criar machine.Pin a cada request
+# aloca objeto e re-inicializa o periférico à toa
+_LED = None
+
+
+def _led():
+    global _LED
+    if _LED is None:
+        _LED = machine.Pin(LED_PIN, machine.Pin.OUT)
+    return _LED
+
 
 def connect_wifi():
     """Gerencia conexão WiFi."""
@@ -57,9 +68,9 @@ app.add_middleware(
 # --- Rotas ---
 
 
-@app.get("/")
-async def index(req):
-    return """
+# HTML estático pré-codificado no load do módulo: nenhum encode por
+# request, todos os GET / reutilizam o mesmo objeto bytes
+_INDEX_HTML = """
     <!DOCTYPE html>
     <html>
     <head><title>MicroServer</title></head>
@@ -73,7 +84,12 @@ async def index(req):
         </ul>
     </body>
     </html>
-    """
+    """.encode()
+
+
+@app.get("/")
+async def index(req):
+    return Response.html(_INDEX_HTML)
 
 
 @app.get("/api/status")
@@ -90,9 +106,8 @@ async def control_led(req):
 
     state = data["state"]
     try:
-        pin = machine.Pin(LED_PIN, machine.Pin.OUT)
         val = 1 if state in [1, True, "on"] else 0
-        pin.value(val)
+        _led().value(val)
         return {"success": True, "led": "ON" if val else "OFF"}
     except Exception as e:
         return Response({"error": str(e)}, 500)
@@ -107,7 +122,12 @@ async def ws_echo(ws):
             msg = await ws.receive()
             if msg is None:
                 break
-            await ws.send(f"Echo: {msg}")
+            # Concatenação simples: evita a máquina de formatação de
+            # f-string e mantém frames binários como bytes
+            if isinstance(msg, bytes):
+                await ws.send(b"Echo: " + msg)
+            else:
+                await ws.send("Echo: " + msg)
         except Exception:
             break
     print("Cliente WS desconectado")
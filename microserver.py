@@ -1,9 +1,10 @@
+import json
 import sys
 import time
 import uasyncio as asyncio
-from http import Request, Response, _PHRASES
+from http import Request, Response, _PHRASES, _STATUS_LINES, _CT_LINES, _CT_SSE, _METHODS
 from routing import Router
-from utils import Logger, ConsoleLogger, unquote, get_mime_type
+from utils import Logger, ConsoleLogger, _fast_unquote, get_mime_type
 from middleware import MiddlewarePipeline
 from websocket import WebSocket
 
@@ -19,79 +20,216 @@ except ImportError:
     ECONNRESET = 104
     EMFILE = 23
 
-
-# Semaphore implementation for MicroPython (uasyncio doesn't have Semaphore)
-class _Semaphore:
-    """Async semaphore for MicroPython compatibility"""
-
-    def __init__(self, value=1):
-        self._value = value
-        self._max_value = value
-        self._waiters = []
-
-    def locked(self):
-        """Returns True if semaphore cannot be acquired immediately."""
-        return self._value == 0
-
-    async def __aenter__(self):
-        """Acquire semaphore (async context manager)"""
-        while self._value <= 0:
-            # Wait for release
-            event = asyncio.Event()
-            self._waiters.append(event)
-            await event.wait()
-        self._value -= 1
-        return self
-
-    async def __aexit__(self, exc_type, exc, tb):
-        """Release semaphore (async context manager)"""
-        self._value += 1
-        # Wake up one waiter
-        if self._waiters:
-            waiter = self._waiters.pop(0)
-            waiter.set()
-        return False
-
-CHUNK_SIZE = const(512)
-_READLINE_TIMEOUT = const(2)
-_HEADER_TIMEOUT = const(2)
+# TCP_NODELAY quando a porta expõe (LWIP enxuto pode não ter): com os
+# writes já coalescidos na aplicação, Nagle só adiciona espera de ACK no
+# último send pequeno de cada resposta keep-alive
+try:
+    import socket as _socket
+    _TCP_NODELAY = getattr(_socket, "TCP_NODELAY", None)
+    _IPPROTO_TCP = getattr(_socket, "IPPROTO_TCP", 6)
+except ImportError:
+    _TCP_NODELAY = None
+    _IPPROTO_TCP = 6
+
+
+# 2048 aproxima o chunk do MSS típico: menos iterações de generator e
+# frames maiores por write no streaming de arquivo
+CHUNK_SIZE = const(2048)
+# Prefixo chunked do tamanho cheio (hex + CRLF), pré-codificado
+_FULL_CHUNK_PREFIX = b"%x\r\n" % CHUNK_SIZE
+# High-water mark do streaming chunked: acumula frames até esse tamanho
+# antes de cada write+drain (um flush a cada ~2 chunks cheios)
+_WRITE_HWM = const(4096)
+# Deadline agregado (request line + headers) de um request: um único
+# timer de wait_for cobre toda a leitura do head
+_HEAD_TIMEOUT = const(4)
 _MAX_HEADERS = const(50)
+# GC amortizado: coleta a cada N conexões ou quando o heap aperta, em vez
+# de uma coleta cheia (multi-ms, bloqueia o event loop) por conexão
+_GC_EVERY_CONNS = const(16)
+_GC_MIN_FREE = const(16 * 1024)
+_mem_free = getattr(gc, "mem_free", None)  # só existe em MicroPython
 _MAX_HEADER_SIZE = const(8192)
 _MAX_REQUEST_LINE = const(8192)
 _BODY_TIMEOUT = const(30)
 
 
+# Métodos em bytes -> str canônico: a request line é fatiada em bytes e o
+# método conhecido sai da tabela sem decode/upper, já como o mesmo objeto
+# str que o router usa nas chaves
+_METHODS_B = {m.encode(): m for m in _METHODS}
+
+# Headers conhecidos: bytes minúsculos -> nome str canônico. bytes.lower()
+# roda em C (sem decode) e o get devolve sempre o mesmo objeto str, então
+# as linhas comuns não alocam string nova nem passam pela validação de token
+_KNOWN_HEADERS = {
+    b"host": "host",
+    b"connection": "connection",
+    b"content-length": "content-length",
+    b"content-type": "content-type",
+    b"upgrade": "upgrade",
+    b"user-agent": "user-agent",
+    b"accept": "accept",
+    b"accept-encoding": "accept-encoding",
+    b"accept-language": "accept-language",
+    b"authorization": "authorization",
+    b"cache-control": "cache-control",
+    b"cookie": "cookie",
+    b"origin": "origin",
+    b"if-none-match": "if-none-match",
+    b"sec-websocket-key": "sec-websocket-key",
+    b"sec-websocket-version": "sec-websocket-version",
+}
+
+
+async def _wait_closed(writer):
+    """Espera o fechamento do transporte sem segurar o task do request."""
+    try:
+        await writer.wait_closed()
+    except Exception:
+        pass
+
+
+# Validação de token (RFC 7230 §3.2) em bytes: translate deleta os bytes
+# VÁLIDOS — resultado vazio significa nome só de token chars. Uma chamada
+# em C no lugar do generator all(isalnum) por caractere. Tokens são ASCII
+# por definição, então nomes não-ASCII (que o isalnum antigo aceitava)
+# passam a ser rejeitados
+_TOKEN_CHARS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+_TOKEN_SET = frozenset(_TOKEN_CHARS)
+try:
+    b"A".translate(None, _TOKEN_CHARS)
+    _HAS_TRANSLATE = True
+except (AttributeError, TypeError):
+    # bytes.translate indisponível (builds MicroPython enxutas)
+    _HAS_TRANSLATE = False
+
+# Fallback sem translate: o re do MicroPython (re1.5) roda o match em C,
+# bem mais rápido que o loop por byte — que fica só como última opção
+_TOKEN_RE = None
+if not _HAS_TRANSLATE:
+    try:
+        import re
+        _TOKEN_RE = re.compile(b"^[A-Za-z0-9_-]+$")
+    except Exception:
+        _TOKEN_RE = None
+
+
+def _is_token(key_b):
+    if _HAS_TRANSLATE:
+        return not key_b.translate(None, _TOKEN_CHARS)
+    if _TOKEN_RE is not None:
+        return _TOKEN_RE.match(key_b) is not None
+    for c in key_b:
+        if c not in _TOKEN_SET:
+            return False
+    return True
+
+
+def _append_chunk(pending, chunk):
+    """Anexa um frame chunked (size\\r\\ndata\\r\\n) ao buffer de saída."""
+    if not chunk:
+        return
+    if isinstance(chunk, str):
+        chunk = chunk.encode()
+    n = len(chunk)
+    # Prefixo do tamanho cheio pré-computado: no streaming de arquivo todo
+    # chunk menos o último cai nesse caso
+    pending += _FULL_CHUNK_PREFIX if n == CHUNK_SIZE else b"%x\r\n" % n
+    pending += chunk
+    pending += b"\r\n"
+
+
+def _canned_response(status, message):
+    """Resposta de erro completa pré-montada (sempre Connection: close)."""
+    body = message.encode()
+    return (
+        _STATUS_LINES[status]
+        + b"Connection: close\r\nContent-Type: text/plain\r\n"
+        + b"Content-Length: %d\r\n\r\n" % len(body)
+        + body
+    )
+
+
+# Caminhos de rejeição (flood/DoS é onde menos queremos gastar CPU):
+# bytes prontos escritos direto no writer, sem Response nem _send_response
+_R_408 = _canned_response(408, "Request Timeout")
+_R_400_LENGTH = _canned_response(400, "Invalid Content-Length")
+_R_413 = _canned_response(413, "Payload Too Large")
+_R_414 = _canned_response(414, "URI Too Long")
+_R_431_SIZE = _canned_response(431, "Header Too Large")
+_R_431_COUNT = _canned_response(431, "Too Many Headers")
+_R_503 = _STATUS_LINES[503] + b"Retry-After: 5\r\nConnection: close\r\nContent-Length: 0\r\n\r\n"
+
+# 404 é hot path sob scanners/typos: Response template com o body JSON já
+# serializado e o blob completo pré-montado — servir um 404 não roda dict,
+# dumps nem formatação de header. O dispatcher devolve um _clone() por
+# request (body/blob compartilhados, slots de header zerados): middlewares
+# podem anexar headers sem mutar o template nem corrida entre 404s
+# concorrentes
+_404_BODY = json.dumps({"error": "Not Found", "code": 404}, separators=(",", ":")).encode()
+_RESP_404 = Response(_404_BODY, status=404)
+_RESP_404._prebuilt = (
+    b"Content-Type: application/json\r\n"
+    + b"Content-Length: %d\r\n\r\n" % len(_404_BODY)
+    + _404_BODY
+)
+
+
+# Tabelas do HTTP-date hoisted para o módulo: _format_http_date não
+# realoca as listas a cada chamada
+_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
 def _format_http_date():
     """Format current time as RFC 7231 HTTP-date (IMF-fixdate)"""
     t = time.gmtime()
-    days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
     return "{}, {:02d} {} {:04d} {:02d}:{:02d}:{:02d} GMT".format(
-        days[t[6]], t[2], months[t[1]-1], t[0], t[3], t[4], t[5]
+        _DAYS[t[6]], t[2], _MONTHS[t[1]-1], t[0], t[3], t[4], t[5]
     )
 
 
 class MicroServer:
     def __init__(
-        self, port: int = 80, logger: Logger = None, router=None, max_conns: int = 10
+        self, port: int = 80, logger: Logger = None, router=None, max_conns: int = 10,
+        use_uvloop: bool = True, burst_conns: int = None
     ):
         # NOTE: ESP32 standard builds often have a hard limit of ~10-16 sockets (LWIP).
         # Setting max_conns > 10 might not work depending on the firmware/usage.
         self.port = port
+        self.use_uvloop = use_uvloop
         self.logger = logger or ConsoleLogger()
         self.router = router or Router()
         self.middlewares = []
         self.max_conns = max_conns
-        self._conn_semaphore = _Semaphore(max_conns)
+        # Limite duro de admissão: entre max_conns (limite "soft") e
+        # burst_conns o servidor ainda aceita, absorvendo rajadas curtas
+        # de requests rápidos; o 503 só sai acima de burst_conns
+        self.burst_conns = burst_conns if burst_conns and burst_conns > max_conns else max_conns
+        # Backlog do listen: o kernel segura o excedente de accepts em vez
+        # de cada conexão custar um task até o 503
+        self.backlog = 128
         self._active_connections = 0
         self._warned_capacity = False
+        self._warned_burst = False
         self.ws_routes = {}
         self.max_body_size = 1024 * 1024  # 1MB limit for safety
         self.server_name = "MicroServer/1.0"
+        # Linha Server pré-codificada (o nome não muda depois do init)
+        self._server_line = ("Server: %s\r\n" % self.server_name).encode()
         self.keep_alive_timeout = 5  # seconds
         self.max_keep_alive_requests = 100
         self.body_timeout = 30  # seconds
         self._handler = None  # Cached pipeline
+        # Linha Date cacheada por segundo: o HTTP-date só muda a cada
+        # segundo, então o formato (6 substituições) roda no máximo 1x/s
+        self._date_cache = (None, b"")
+        self._since_gc = 0
+        # A policy do uvloop precisa estar instalada ANTES do loop ser
+        # criado (asyncio.run); dentro de start()/run() o loop já roda e
+        # o install não teria efeito nele
+        self._maybe_install_uvloop()
 
     def add_middleware(self, middleware):
         self.middlewares.append(middleware)
@@ -141,20 +279,84 @@ class MicroServer:
 
         return decorator
 
-    def mount_static(self, url_path: str, dir_path: str, max_age: int = 3600):
+    def mount_static(self, url_path: str, dir_path: str, max_age: int = 3600,
+                     precache: int = 0):
         import os
 
+        cache_control = f"public, max-age={max_age}"
+
+        # Manifest built once at mount time: url -> (size, etag).
+        # Moves os.stat + ETag computation out of the request hot path and
+        # enables conditional GET (If-None-Match -> 304) for free.
+        # With a `precache` byte budget, small files are additionally read
+        # whole at mount time and baked into a complete response blob
+        # (Content-Type..body): serving them is a dict get + one write.
+        manifest = {}
+        precached = {}
+        budget = precache
+        try:
+            for name in os.listdir(dir_path):
+                try:
+                    st = os.stat(dir_path + "/" + name)
+                except OSError:
+                    continue
+                if st[0] & 0x4000:  # skip directories
+                    continue
+                size = st[6]
+                etag = '"{:x}-{:x}"'.format(st[8], size)  # mtime-size
+                url = url_path + "/" + name
+                manifest[url] = (size, etag)
+                if size <= budget:
+                    try:
+                        with open(dir_path + "/" + name, "rb") as f:
+                            body = f.read()
+                    except OSError:
+                        continue
+                    budget -= size
+                    # body fica na Response como rede de segurança caso o
+                    # blob seja limpo; o envio normal sai sempre do blob
+                    resp = Response(body, 200, content_type=get_mime_type(name))
+                    resp._prebuilt = (
+                        ("Content-Type: %s\r\n" % resp.content_type).encode()
+                        + ("Cache-Control: %s\r\n" % cache_control).encode()
+                        + ("ETag: %s\r\n" % etag).encode()
+                        + b"Content-Length: %d\r\n\r\n" % len(body)
+                        + body
+                    )
+                    precached[url] = resp
+        except OSError:
+            pass  # Directory missing at mount; handler falls back to stat
+
         async def static_handler(request):
             file_path = request.path.replace(url_path, dir_path, 1)
             if ".." in file_path:
                 return Response.plain("Forbidden", 403)
-            try:
-                os.stat(file_path)
-            except OSError:
-                return Response.plain("Not Found", 404)
+
+            entry = manifest.get(request.path)
+            if entry:
+                etag = entry[1]
+                if request.headers.get("if-none-match") == etag:
+                    response = Response("", 304)
+                    response.add_header("ETag", etag)
+                    response.add_header("Cache-Control", cache_control)
+                    return response
+                # Hot path: arquivo pequeno com a resposta inteira montada
+                # no mount — devolve um clone do template (blob
+                # compartilhado, headers por request), sem stream
+                cached = precached.get(request.path)
+                if cached is not None:
+                    return cached._clone()
+            else:
+                # File created after mount (or dir missing at mount time)
+                try:
+                    os.stat(file_path)
+                except OSError:
+                    return Response.plain("Not Found", 404)
 
             response = self.send_file(file_path)
-            response.add_header("Cache-Control", f"public, max-age={max_age}")
+            if entry:
+                response.add_header("ETag", entry[1])
+            response.add_header("Cache-Control", cache_control)
             return response
 
         self.route(url_path, methods=["GET"])(static_handler)
@@ -163,13 +365,17 @@ class MicroServer:
     def send_file(self, filename: str):
         async def file_gen():
             f = None
+            # Buffer único reutilizado: readinto preenche o bytearray e o
+            # yield entrega uma view, sem alocar bytes novos por chunk
+            buf = bytearray(CHUNK_SIZE)
+            mv = memoryview(buf)
             try:
                 f = open(filename, "rb")
                 while True:
-                    data = f.read(CHUNK_SIZE)
-                    if not data:
+                    n = f.readinto(buf)
+                    if not n:
                         break
-                    yield data
+                    yield mv if n == CHUNK_SIZE else mv[:n]
                     await asyncio.sleep_ms(0)  # Yield control
             finally:
                 if f:
@@ -182,17 +388,29 @@ class MicroServer:
 
     async def _dispatch_request(self, request):
         """Encontra o handler para a rota e executa."""
-        handler, params = self.router.match(request.method, request.path)
+        # HEAD roteia como GET (semântica HTTP padrão): o writer descarta
+        # o body. Mapear antes do match também evita que um HEAD poluísse
+        # o cache de 404 (keyed por path) para o GET da mesma rota
+        method = request.method
+        if method == "HEAD":
+            method = "GET"
+        handler, params = self.router.match(method, request.path)
 
         if not handler:
-            return Response.error("Not Found", 404)
+            return _RESP_404._clone()
 
         request.path_params = params
 
         try:
             result = await handler(request)
 
+            # Fast path: checagem de classe por identidade — no caso comum
+            # (handler devolve Response) não entra nem no isinstance
+            if result.__class__ is Response:
+                return result
+
             # Estrito: O handler DEVE retornar um objeto Response
+            # (isinstance cobre subclasses de Response)
             if not isinstance(result, Response):
                 # Levanta exceção para ser capturada pelo bloco except abaixo
                 raise ValueError(f"Handler returned {type(result)}, expected Response")
@@ -204,151 +422,323 @@ class MicroServer:
             return Response.error("Internal Server Error", 500)
 
     async def _handle_request(self, reader, writer):
-        # Try to acquire semaphore (non-blocking check)
-        if self._conn_semaphore.locked():
-            # Semaphore full, reject immediately
+        # Admissão por contador, sem lock: checar e incrementar não cede ao
+        # event loop, então não há corrida entre tasks. Entre max_conns e
+        # burst_conns a conexão entra (absorve rajadas curtas); o 503
+        # pré-montado só sai no limite duro
+        active = self._active_connections
+        if active >= self.burst_conns:
             try:
-                writer.write(b"HTTP/1.1 503 Service Unavailable\r\n")
-                writer.write(b"Retry-After: 5\r\n")
-                writer.write(b"Content-Length: 0\r\n\r\n")
+                writer.write(_R_503)
                 await writer.drain()
             finally:
                 writer.close()
             return
+        self._active_connections = active + 1
+
+        # Capacity warning
+        if active + 1 >= self.max_conns * 0.8 and not self._warned_capacity:
+            self.logger.log(f"WARNING: 80% capacity ({active + 1}/{self.max_conns})", "WARNING")
+            self._warned_capacity = True
+        if active + 1 > self.max_conns and not self._warned_burst:
+            self.logger.log(f"Burst capacity in use ({active + 1}/{self.burst_conns})", "WARNING")
+            self._warned_burst = True
+
+        request_count = 0
+        addr = writer.get_extra_info("peername")
+        if _TCP_NODELAY is not None:
+            try:
+                # CPython expõe o socket via extra info; o Stream do
+                # uasyncio guarda em .s
+                sock = writer.get_extra_info("socket") or getattr(writer, "s", None)
+                if sock is not None:
+                    sock.setsockopt(_IPPROTO_TCP, _TCP_NODELAY, 1)
+            except (OSError, AttributeError):
+                pass  # porta sem a opção: segue com Nagle ligado
+        # Buffer de body da conexão: alocado sob demanda no primeiro
+        # POST/PUT e reutilizado pelos requests keep-alive seguintes
+        body_buf = None
+        # Buffer de scan do head (caminho readinto): sobras de leitura
+        # ficam aqui entre _read_head e _create_request
+        pending = bytearray()
+        # Scratch de resposta: headers (+body pequeno) de cada resposta
+        # são montados no mesmo bytearray, resetado entre requests
+        scratch = bytearray()
 
-        async with self._conn_semaphore:
-            self._active_connections += 1
-
-            # Capacity warning
-            if self._active_connections >= self.max_conns * 0.8 and not self._warned_capacity:
-                self.logger.log(f"WARNING: 80% capacity ({self._active_connections}/{self.max_conns})", "WARNING")
-                self._warned_capacity = True
+        try:
+            while request_count < self.max_keep_alive_requests:
+                # Deadline único para request line + headers: um timer
+                # de wait_for por request em vez de um por readline
+                # (uasyncio não tem loop.call_later para armar um
+                # cancel manual; o wait_for agregado dá o mesmo efeito)
+                try:
+                    head = await asyncio.wait_for(
+                        self._read_head(reader, writer, pending), _HEAD_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    # Conexão nova sem request ou keep-alive ocioso
+                    break
 
-            request_count = 0
-            addr = writer.get_extra_info("peername")
+                if head is None:
+                    break
 
-            try:
-                while request_count < self.max_keep_alive_requests:
-                    # Parse request line with timeout
-                    try:
-                        line = await asyncio.wait_for(reader.readline(), _READLINE_TIMEOUT)
-                    except asyncio.TimeoutError:
-                        if request_count == 0:
-                            # No request received on new connection
-                            break
-                        else:
-                            # Idle timeout on keep-alive connection
-                            break
-
-                    if not line:
-                        break
+                method, path, headers = head
 
-                    if len(line) > _MAX_REQUEST_LINE:
-                        await self._send_response(writer, Response.plain("URI Too Long", 414), keep_alive=False, requests_remaining=0)
-                        break
+                # Check keep-alive preference. Igualdade direta antes do
+                # .lower(): o token costuma vir minúsculo e o caso comum
+                # (header ausente ou já canônico) não aloca string nova
+                conn = headers.get("connection")
+                keep_alive = conn is not None and (
+                    conn == "keep-alive" or conn.lower() == "keep-alive"
+                )
 
-                    parts = line.decode().strip().split()
-                    if len(parts) < 2:
-                        break
+                # Handle WebSocket upgrade
+                upg = headers.get("upgrade")
+                if (
+                    upg is not None
+                    and (upg == "websocket" or upg.lower() == "websocket")
+                    and path in self.ws_routes
+                ):
+                    await self._handle_websocket(reader, writer, path, headers)
+                    return  # WebSocket takes over connection
+
+                # Handle HTTP request
+                request, body_buf = await self._create_request(
+                    reader, writer, method, path, headers, addr, body_buf,
+                    pending
+                )
+                if not request:
+                    break
 
-                    method, path = parts[0].upper(), unquote(parts[1])
-
-                    # Parse headers
-                    headers = {}
-                    header_count = 0
-
-                    while True:
-                        if header_count >= _MAX_HEADERS:
-                            await self._send_response(writer, Response.plain("Too Many Headers", 431), keep_alive=False, requests_remaining=0)
-                            return
-
-                        header_line = await asyncio.wait_for(reader.readline(), _HEADER_TIMEOUT)
-                        if not header_line or header_line == b"\r\n":
-                            break
-
-                        if len(header_line) > _MAX_HEADER_SIZE:
-                            await self._send_response(writer, Response.plain("Header Too Large", 431), keep_alive=False, requests_remaining=0)
-                            return
-
-                        if b":" not in header_line:
-                            continue
-
-                        try:
-                            key, value = header_line.decode().strip().split(":", 1)
-                            # Validate token format (RFC 7230 §3.2)
-                            if not key or not all(c.isalnum() or c in "-_" for c in key):
-                                continue
-                            headers[key.lower()] = value.strip()
-                            header_count += 1
-                        except (ValueError, UnicodeDecodeError):
-                            continue
-
-                    # Check keep-alive preference
-                    connection_header = headers.get("connection", "").lower()
-                    keep_alive = (connection_header == "keep-alive")
-
-                    # Handle WebSocket upgrade
-                    if headers.get("upgrade", "").lower() == "websocket" and path in self.ws_routes:
-                        await self._handle_websocket(reader, writer, path, headers)
-                        return  # WebSocket takes over connection
-
-                    # Handle HTTP request
-                    request = await self._create_request(reader, writer, method, path, headers, addr)
-                    if not request:
-                        break
+                handler = self._get_handler()
+                response = await handler(request)
 
-                    handler = self._get_handler()
-                    response = await handler(request)
+                # Send response with appropriate Connection header
+                should_keep_alive = keep_alive and request_count < self.max_keep_alive_requests - 1
+                await self._send_response(
+                    writer, response,
+                    keep_alive=should_keep_alive,
+                    requests_remaining=self.max_keep_alive_requests - request_count - 1,
+                    is_head=method == "HEAD", buf=scratch
+                )
 
-                    # Send response with appropriate Connection header
-                    should_keep_alive = keep_alive and request_count < self.max_keep_alive_requests - 1
+                request_count += 1
+
+                if not should_keep_alive:
+                    break
+
+                # Wait for next request with keep-alive timeout
+                # Note: Due to MicroPython limitations, we can't peek/pushback bytes efficiently
+                # So we just wait for the next iteration to read the next request
+                await asyncio.sleep(0)  # Yield control
+
+        except asyncio.TimeoutError:
+            # Normal behavior for keep-alive/pre-opened connections that don't send data
+            pass
+        except OSError as e:
+            # Ignora erros de desconexão comuns
+            if e.args[0] in (EPIPE, ECONNRESET):
+                self.logger.log(f"Connection closed by peer: {e}", "DEBUG")
+            elif e.args[0] == EMFILE:
+                self.logger.log(f"System limit reached: {e}", "WARNING")
+                try:
                     await self._send_response(
-                        writer, response,
-                        keep_alive=should_keep_alive,
-                        requests_remaining=self.max_keep_alive_requests - request_count - 1
+                        writer, Response.error("Service Unavailable", 503),
+                        keep_alive=False, requests_remaining=0
                     )
+                except Exception:
+                    pass
+            else:
+                sys.print_exception(e)
+                self.logger.log(f"Server Error: {repr(e)}", "ERROR")
+        except Exception as e:
+            sys.print_exception(e)
+            self.logger.log(f"Server Error: {repr(e)}", "ERROR")
+        finally:
+            self._active_connections -= 1
+            try:
+                # drain continua: no uasyncio é o drain que faz o I/O
+                # do buffer de saída (close não flusha pendências)
+                await writer.drain()
+                writer.close()
+                # wait_closed pode segurar dezenas de ms esperando o
+                # FIN/ACK; em background o slot do semáforo libera já
+                asyncio.create_task(_wait_closed(writer))
+            except Exception:
+                pass
+            self._since_gc += 1
+            if self._since_gc >= _GC_EVERY_CONNS or (
+                _mem_free is not None and _mem_free() < _GC_MIN_FREE
+            ):
+                gc.collect()
+                self._since_gc = 0
 
-                    request_count += 1
+    async def _reject(self, writer, raw):
+        """Escreve uma resposta de erro pré-montada (conexão será fechada)."""
+        writer.write(raw)
+        await writer.drain()
 
-                    if not should_keep_alive:
-                        break
+    async def _read_head(self, reader, writer, pending):
+        """Lê request line + headers (sob o deadline único do chamador).
 
-                    # Wait for next request with keep-alive timeout
-                    # Note: Due to MicroPython limitations, we can't peek/pushback bytes efficiently
-                    # So we just wait for the next iteration to read the next request
-                    await asyncio.sleep(0)  # Yield control
+        `pending` é o buffer de scan da conexão (caminho sem readuntil):
+        bytes lidos além do fim do head (início do body ou request
+        pipelined) permanecem nele para o próximo consumidor.
+        Retorna (method, path, headers) ou None para encerrar a conexão
+        (linha inválida, EOF, ou erro já respondido ao cliente).
+        """
+        readuntil = getattr(reader, "readuntil", None)
 
-            except asyncio.TimeoutError:
-                # Normal behavior for keep-alive/pre-opened connections that don't send data
-                pass
-            except OSError as e:
-                # Ignora erros de desconexão comuns
-                if e.args[0] in (EPIPE, ECONNRESET):
-                    self.logger.log(f"Connection closed by peer: {e}", "DEBUG")
-                elif e.args[0] == EMFILE:
-                    self.logger.log(f"System limit reached: {e}", "WARNING")
-                    try:
-                        await self._send_response(
-                            writer, Response.error("Service Unavailable", 503),
-                            keep_alive=False, requests_remaining=0
-                        )
-                    except Exception:
-                        pass
-                else:
-                    sys.print_exception(e)
-                    self.logger.log(f"Server Error: {repr(e)}", "ERROR")
+        if readuntil is not None:
+            # CPython: um único read do head inteiro (request line incluída)
+            # até \r\n\r\n, em vez de um syscall por linha. Ler o head
+            # inteiro também cobre requests sem header nenhum, onde um
+            # readuntil só da parte de headers nunca acharia o separador
+            try:
+                raw = await readuntil(b"\r\n\r\n")
             except Exception as e:
-                sys.print_exception(e)
-                self.logger.log(f"Server Error: {repr(e)}", "ERROR")
-            finally:
-                self._active_connections -= 1
-                try:
-                    await writer.drain()
-                    writer.close()
-                    await writer.wait_closed()
-                except Exception:
-                    pass
-                gc.collect()
+                # EOF limpo (keep-alive ocioso fechado pelo cliente): sem
+                # resposta; head truncado ou acima do limite interno do
+                # stream: 431
+                if not getattr(e, "partial", None):
+                    return None
+                await self._reject(writer, _R_431_SIZE)
+                return None
+
+            # No caminho bulk o cap vale para o head inteiro
+            if len(raw) > _MAX_REQUEST_LINE + _MAX_HEADER_SIZE:
+                await self._reject(writer, _R_431_SIZE)
+                return None
+        else:
+            # MicroPython: uasyncio não tem readuntil e o readline lê byte
+            # a byte. Aqui o head entra em blocos via readinto num buffer
+            # da conexão, com scan incremental de \r\n\r\n
+            raw = await self._fill_head(reader, pending)
+            if raw is None:
+                return None
+            if raw is False:
+                await self._reject(writer, _R_431_SIZE)
+                return None
+
+        eol = raw.find(b"\r\n")
+        if eol < 0:
+            # Sem \r\n interno: request line sem nenhum header (caminho
+            # readinto, que remove o separador final do head)
+            line = raw
+            header_lines = ()
+        else:
+            line = raw[:eol]
+            header_lines = raw[eol + 2 :].split(b"\r\n")
+
+        if len(line) > _MAX_REQUEST_LINE:
+            await self._reject(writer, _R_414)
+            return None
+
+        # Request line fatiada em bytes: sem decode da linha inteira nem
+        # lista intermediária do split
+        sp1 = line.find(b" ")
+        if sp1 <= 0:
+            return None
+        sp2 = line.find(b" ", sp1 + 1)
+        path_b = line[sp1 + 1 : sp2] if sp2 != -1 else line[sp1 + 1 :].strip()
+        if not path_b:
+            return None
+
+        method = _METHODS_B.get(line[:sp1])
+        if method is None:
+            method = line[:sp1].decode().upper()
+        # Short-circuit: um 'in' (memchr) evita o loop de decode no caso
+        # comum de path sem percent-encoding
+        path = _fast_unquote(path_b.decode())
+
+        # Parse headers
+        headers = {}
+        header_count = 0
+
+        for header_line in header_lines:
+            if not header_line:
+                continue
+            if header_count >= _MAX_HEADERS:
+                await self._reject(writer, _R_431_COUNT)
+                return None
+            if self._store_header(header_line, headers):
+                header_count += 1
+
+        return method, path, headers
+
+    async def _fill_head(self, reader, pending):
+        """Acumula bytes em `pending` até conter um head completo.
+
+        Lê em blocos (readinto num buffer fixo; read() como fallback) e
+        procura \\r\\n\\r\\n só no trecho novo. Devolve o head sem o
+        separador, deixando o excedente em `pending`; None em EOF, False
+        quando o head passa do cap de tamanho.
+        """
+        scanned = 0
+        idx = pending.find(b"\r\n\r\n") if pending else -1
+        readinto = getattr(reader, "readinto", None)
+        tmp = mv_tmp = None
+        while idx < 0:
+            scanned = len(pending) - 3 if len(pending) > 3 else 0
+            if len(pending) > _MAX_REQUEST_LINE + _MAX_HEADER_SIZE:
+                return False
+            if readinto is not None:
+                if tmp is None:
+                    tmp = bytearray(256)
+                    mv_tmp = memoryview(tmp)
+                n = await readinto(tmp)
+                if not n:
+                    return None
+                pending += mv_tmp[:n]
+            else:
+                data = await reader.read(256)
+                if not data:
+                    return None
+                pending += data
+            # O separador pode cruzar a fronteira do bloco anterior: o
+            # scan recomeça 3 bytes antes do trecho novo
+            idx = pending.find(b"\r\n\r\n", scanned)
+        head = bytes(pending[:idx])
+        del pending[: idx + 4]
+        return head
+
+    def _store_header(self, line, headers):
+        """Parseia uma linha de header (bytes) e grava em `headers`.
+
+        find + slices de bytes: decodifica só as duas fatias, sem a lista
+        intermediária do split nem o decode da linha inteira.
+        Retorna True se a linha virou um header válido.
+        """
+        i = line.find(b":")
+        if i <= 0:
+            return False
+        # RFC 7230 §3.2.4: espaço entre field-name e ':' é ambiguidade
+        # clássica de request smuggling — rejeita a linha inteira, como o
+        # parser original fazia (sem strip antes da validação)
+        if line[i - 1] in (0x20, 0x09):
+            return False
+        try:
+            name = _KNOWN_HEADERS.get(line[:i].lower())
+            if name is None:
+                key_b = line[:i]
+                # Validação de token direto nos bytes crus: uma chamada C
+                # em vez de decode + generator por caractere (OWS à
+                # esquerda também reprova aqui)
+                if not key_b or not _is_token(key_b):
+                    return False
+                name = key_b.decode().lower()
+            # Trim de OWS/CRLF por índice, nos bytes: decodifica só a
+            # fatia exata do valor, sem o strip() sobre uma string extra
+            j = i + 1
+            end = len(line)
+            while j < end and line[j] in (0x20, 0x09):
+                j += 1
+            while end > j and line[end - 1] in (0x0D, 0x0A, 0x20, 0x09):
+                end -= 1
+            headers[name] = line[j:end].decode()
+            return True
+        except (ValueError, UnicodeDecodeError):
+            return False
 
     async def _handle_websocket(self, reader, writer, path, headers):
         websocket = WebSocket(reader, writer)
@@ -364,89 +754,219 @@ class MicroServer:
         except Exception as e:
             self.logger.log(f"WS Error: {e}", "ERROR")
 
-    async def _create_request(self, reader, writer, method, path, headers, addr):
+    async def _create_request(self, reader, writer, method, path, headers, addr,
+                              body_buf=None, pending=None):
+        """Lê o body (se houver) e monta o Request.
+
+        Retorna (request, body_buf); request None encerra a conexão.
+        `body_buf` é o buffer reutilizado entre requests keep-alive da
+        mesma conexão: com readinto (MicroPython) o body vira uma
+        memoryview sobre ele — handlers devem consumir/copiar o body antes
+        de retornar, pois o buffer é reaproveitado no request seguinte.
+        `pending` traz bytes do body que o scan do head já tirou do socket.
+        """
         content_length_header = headers.get("content-length")
         try:
             content_length = int(content_length_header) if content_length_header else 0
         except ValueError:
-            await self._send_response(
-                writer,
-                Response.plain("Invalid Content-Length", 400),
-                keep_alive=False,
-                requests_remaining=0
-            )
-            return None
+            await self._reject(writer, _R_400_LENGTH)
+            return None, body_buf
 
         body = None
         if content_length > 0:
             if content_length > self.max_body_size:
-                await self._send_response(
-                    writer,
-                    Response.plain("Payload Too Large", 413),
-                    keep_alive=False,
-                    requests_remaining=0
-                )
-                return None
+                await self._reject(writer, _R_413)
+                return None, body_buf
 
+            # Prefixo do body que já saiu do socket junto com o head
+            take = 0
+            if pending:
+                take = content_length if len(pending) >= content_length else len(pending)
+
+            readinto = getattr(reader, "readinto", None)
             try:
-                body = await asyncio.wait_for(
-                    reader.read(content_length),
-                    self.body_timeout
-                )
+                if readinto is not None:
+                    # Lê direto no buffer reutilizado: zero alocação de
+                    # body em POSTs repetidos na mesma conexão
+                    if body_buf is None or len(body_buf) < content_length:
+                        body_buf = bytearray(content_length)
+                    mv = memoryview(body_buf)
+                    pos = take
+                    if take:
+                        mv[:take] = memoryview(pending)[:take]
+                        del pending[:take]
+                    while pos < content_length:
+                        n = await asyncio.wait_for(
+                            readinto(mv[pos:content_length]), self.body_timeout
+                        )
+                        if not n:
+                            return None, body_buf  # EOF antes do body completo
+                        pos += n
+                    body = mv[:content_length]
+                else:
+                    # CPython: StreamReader não tem readinto; readexactly
+                    # garante o body inteiro (read(n) pode retornar menos)
+                    prefix = b""
+                    if take:
+                        prefix = bytes(pending[:take])
+                        del pending[:take]
+                    rest = content_length - take
+                    if rest:
+                        body = await asyncio.wait_for(
+                            reader.readexactly(rest),
+                            self.body_timeout
+                        )
+                        if prefix:
+                            body = prefix + body
+                    else:
+                        body = prefix
             except asyncio.TimeoutError:
-                await self._send_response(
-                    writer,
-                    Response.plain("Request Timeout", 408),
-                    keep_alive=False,
-                    requests_remaining=0
-                )
-                return None
+                await self._reject(writer, _R_408)
+                return None, body_buf
+            except EOFError:
+                return None, body_buf
 
         request = Request(method, path, headers, addr[0])
         request.body = body
-        return request
+        return request, body_buf
 
-    async def _send_response(self, writer, response, keep_alive=False, requests_remaining=0):
-        reason = self._reason_phrase(response.status)
-        http_date = _format_http_date()
+    def _date_line(self):
+        """Linha Date pré-codificada, renovada no máximo uma vez por segundo."""
+        # int(): em CPython time.time() é float e mudaria a cada chamada
+        now = int(time.time())
+        ts, cached = self._date_cache
+        if now != ts:
+            cached = b"Date: %s\r\n" % _format_http_date().encode()
+            self._date_cache = (now, cached)
+        return cached
 
-        # Detect Server-Sent Events (SSE)
-        is_sse = response.content_type == "text/event-stream"
+    async def _send_response(self, writer, response, keep_alive=False, requests_remaining=0,
+                             is_head=False, buf=None):
 
-        writer.write(f"HTTP/1.1 {response.status} {reason}\r\n".encode())
-        writer.write(f"Date: {http_date}\r\n".encode())
-        writer.write(f"Server: {self.server_name}\r\n".encode())
+        # Detect Server-Sent Events (SSE)
+        is_sse = response.content_type == _CT_SSE
+
+        status_line = _STATUS_LINES.get(response.status)
+        if status_line is None:
+            # Código fora de _PHRASES: formata dinamicamente
+            status_line = f"HTTP/1.1 {response.status} {self._reason_phrase(response.status)}\r\n".encode()
+
+        # Scratch da conexão: o mesmo bytearray é resetado e reaproveitado
+        # pelos requests keep-alive seguintes (write copia os bytes para o
+        # buffer do transporte, então mutar depois é seguro). Chamadas
+        # avulsas alocam um local
+        if buf is None:
+            buf = bytearray()
+        else:
+            del buf[:]
+
+        buf += status_line
+        buf += self._date_line()
+        buf += self._server_line
+
+        # Resposta pré-montada (precache de estáticos / 404 canned): só as
+        # linhas variáveis são montadas por request; o resto sai num write
+        # só. Headers custom/middleware entram ANTES do blob (que começa
+        # nas próprias linhas de header), então anexar um header não
+        # desabilita o fast path nem perde ETag/Cache-Control do blob
+        pre = response._prebuilt
+        if pre is not None:
+            if keep_alive:
+                buf += b"Connection: keep-alive\r\n"
+                buf += b"Keep-Alive: timeout=%d, max=%d\r\n" % (
+                    self.keep_alive_timeout, requests_remaining)
+            else:
+                buf += b"Connection: close\r\n"
+            headers = response._headers
+            if headers:
+                hdr_bytes = response._hdr_bytes
+                if hdr_bytes is None:
+                    hdr_bytes = response._hdr_bytes = "".join(
+                        ["%s: %s\r\n" % (k, v) for k, v in headers.items()]
+                    ).encode()
+                buf += hdr_bytes
+            raw_hdrs = response._raw_headers
+            if raw_hdrs is not None:
+                buf += raw_hdrs
+            if is_head:
+                # HEAD: só os headers do blob (Content-Length intacto)
+                pre = pre[: pre.find(b"\r\n\r\n") + 4]
+            buf += pre
+            writer.write(buf)
+            await writer.drain()
+            return
 
         # SSE requires keep-alive always
         if is_sse or keep_alive:
-            writer.write(b"Connection: keep-alive\r\n")
+            buf += b"Connection: keep-alive\r\n"
             if not is_sse:  # SSE doesn't need Keep-Alive header (infinite stream)
-                writer.write(f"Keep-Alive: timeout={self.keep_alive_timeout}, max={requests_remaining}\r\n".encode())
+                # bytes.__mod__ formata direto em bytes, sem a string
+                # intermediária do f-string + encode
+                buf += b"Keep-Alive: timeout=%d, max=%d\r\n" % (self.keep_alive_timeout, requests_remaining)
         else:
-            writer.write(b"Connection: close\r\n")
-
-        writer.write(f"Content-Type: {response.content_type}\r\n".encode())
-        for key, value in response.headers.items():
-            writer.write(f"{key}: {value}\r\n".encode())
-
-        if self._is_streaming_body(response.body):
-            if is_sse:
+            buf += b"Connection: close\r\n"
+
+        ct_line = _CT_LINES.get(response.content_type)
+        if ct_line is None:
+            ct_line = f"Content-Type: {response.content_type}\r\n".encode()
+        buf += ct_line
+        # Acesso direto ao slot: evita que a property aloque o dict em
+        # respostas sem headers custom
+        headers = response._headers
+        if headers:
+            hdr_bytes = response._hdr_bytes
+            if hdr_bytes is None:
+                # Memoiza o bloco codificado na Response: reenvios do
+                # mesmo objeto (ex.: singleton de erro) pulam o encode
+                hdr_bytes = response._hdr_bytes = "".join(
+                    ["%s: %s\r\n" % (k, v) for k, v in headers.items()]
+                ).encode()
+            buf += hdr_bytes
+        # Blob de headers pré-codificado (middlewares com headers fixos)
+        raw_hdrs = response._raw_headers
+        if raw_hdrs is not None:
+            buf += raw_hdrs
+
+        body = response.body
+        if isinstance(body, (dict, list)):
+            # JSON lazy: serializa uma única vez, no momento do envio
+            # (separators compactos poupam bytes no link WiFi)
+            body = json.dumps(body, separators=(",", ":")).encode()
+
+        if response._streaming:
+            if is_head:
+                # HEAD não tem body por definição: a resposta termina nos
+                # headers, sem rodar o generator
+                buf += b"\r\n" if is_sse else b"Transfer-Encoding: chunked\r\n\r\n"
+                writer.write(buf)
+            elif is_sse:
                 # SSE uses raw streaming (não chunked)
-                await self._send_sse_body(writer, response.body)
+                buf += b"\r\n"
+                writer.write(buf)
+                await self._send_sse_body(writer, body)
             else:
                 # Regular streaming usa chunked encoding
-                await self._send_streaming_body(writer, response.body)
+                buf += b"Transfer-Encoding: chunked\r\n\r\n"
+                writer.write(buf)
+                await self._send_streaming_body(writer, body)
         else:
-            await self._send_payload(writer, response.body)
+            if body is None:
+                body = b""
+            elif isinstance(body, str):
+                body = body.encode()
+            buf += b"Content-Length: %d\r\n\r\n" % len(body)
+            if not is_head:
+                # HEAD: Content-Length do body real, mas sem os bytes
+                buf += body
+            writer.write(buf)
         await writer.drain()
 
     async def _send_sse_body(self, writer, body):
         """
         Envia body para Server-Sent Events (SSE)
         SSE não usa chunked encoding, envia raw data
+        (o fim dos headers já saiu no write coalescido do _send_response)
         """
-        writer.write(b"\r\n")  # Finalizar headers
-
         gen = body
         if hasattr(gen, "__aiter__"):
             async for event in gen:
@@ -462,59 +982,71 @@ class MicroServer:
                 await writer.drain()
 
     async def _send_streaming_body(self, writer, body):
-        writer.write(b"Transfer-Encoding: chunked\r\n\r\n")
+        # Batching com high-water mark: os frames chunked acumulam num
+        # buffer e saem em writes+drains de ~_WRITE_HWM bytes, em vez de
+        # um drain (yield para o scheduler + flush) por chunk. O extend
+        # também copia as memoryviews reutilizadas do send_file antes de
+        # devolver o controle ao generator
+        pending = bytearray()
         gen = body
         if hasattr(gen, "__aiter__"):
             async for chunk in gen:
-                await self._write_chunk(writer, chunk)
+                _append_chunk(pending, chunk)
+                if len(pending) >= _WRITE_HWM:
+                    writer.write(pending)
+                    await writer.drain()
+                    pending = bytearray()
         else:
             for chunk in gen:
-                await self._write_chunk(writer, chunk)
-        writer.write(b"0\r\n\r\n")
-
-    async def _send_payload(self, writer, payload):
-        if isinstance(payload, str):
-            payload = payload.encode()
-        writer.write(f"Content-Length: {len(payload)}\r\n\r\n".encode())
-        writer.write(payload)
+                _append_chunk(pending, chunk)
+                if len(pending) >= _WRITE_HWM:
+                    writer.write(pending)
+                    await writer.drain()
+                    pending = bytearray()
+        pending += b"0\r\n\r\n"
+        writer.write(pending)
+        await writer.drain()
 
-    async def _write_chunk(self, writer, chunk):
-        if not chunk:
+    def _setup_gc(self):
+        # Com threshold armado, o runtime coleta por pressão de alocação
+        # em vez de depender das coletas por conexão (MicroPython apenas;
+        # o gc do CPython não expõe threshold/mem_free nesse formato)
+        thr = getattr(gc, "threshold", None)
+        if thr is not None and _mem_free is not None:
+            gc.collect()
+            thr(_mem_free() // 4 + gc.mem_alloc())
+
+    def _maybe_install_uvloop(self):
+        # uvloop só existe em CPython/Linux: accept/read/write passam a rodar
+        # na implementação em C do libuv. Em MicroPython o import falha e o
+        # uasyncio nativo segue em uso — sem efeito no ESP32. Chamado do
+        # __init__, antes do asyncio.run criar o loop, senão a policy nova
+        # não alcança o loop corrente.
+        if not self.use_uvloop:
             return
-        if isinstance(chunk, str):
-            chunk = chunk.encode()
-
-        # Build complete chunk: size\r\ndata\r\n (single write for efficiency)
-        size_hex = f"{len(chunk):x}"
-        complete = bytearray()
-        complete.extend(size_hex.encode())
-        complete.extend(b"\r\n")
-        complete.extend(chunk)
-        complete.extend(b"\r\n")
-
-        writer.write(complete)
-        await writer.drain()
+        self.use_uvloop = False  # tenta uma única vez
+        try:
+            import uvloop
+
+            uvloop.install()
+        except ImportError:
+            pass
 
     async def start(self):
+        self._setup_gc()
         self.logger.log(f"Server started on port {self.port}")
-        return await asyncio.start_server(self._handle_request, "0.0.0.0", self.port)
+        return await asyncio.start_server(
+            self._handle_request, "0.0.0.0", self.port, backlog=self.backlog
+        )
 
     async def run(self, host: str = "0.0.0.0", port: int = None):
+        self._setup_gc()
         if port is not None:
             self.port = port
         self.logger.log(f"Server started on port {self.port}")
-        return await asyncio.start_server(self._handle_request, host, self.port)
+        return await asyncio.start_server(
+            self._handle_request, host, self.port, backlog=self.backlog
+        )
 
     def _reason_phrase(self, status: int) -> str:
         return _PHRASES.get(status, "")
-
-    def _is_streaming_body(self, body) -> bool:
-        if body is None:
-            return False
-        if hasattr(body, "__aiter__"):
-            return True
-        if hasattr(body, "__next__"):
-            return True
-        if hasattr(body, "__iter__") and not isinstance(body, (bytes, bytearray, str)):
-            return True
-        return False
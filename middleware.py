@@ -1,7 +1,18 @@
 import time
+from micropython import const
 from utils import Logger, ConsoleLogger
 from http import Response
 
+# Limiares do formato de duração como const: viram constantes de bytecode
+# no MicroPython em vez de literais int grandes re-parseados por request
+_US_MS = const(1000)
+_US_S = const(1000000)
+
+# Formato do log em % no nível do módulo: uma única interpolação em C por
+# request, sem o custo de f-string/concatenação no MicroPython
+_TS_FMT = "%02d/%02d/%04d %02d:%02d:%02d"
+_LOG_FMT = "%s | %s | %s %s | %d | %s"
+
 
 class CORSMiddleware:
     def __init__(
@@ -21,53 +32,82 @@ class CORSMiddleware:
         if allow_credentials:
             self.cors_headers["Access-Control-Allow-Credentials"] = "true"
 
-        # Cache the OPTIONS response entirely since it never changes
-        # This saves memory allocation on every preflight request
+        # Os headers são fixos desde a construção: um único blob em bytes,
+        # anexado pelo writer como está — sem inserções de dict nem encode
+        # por request
+        self._cors_blob = "".join(
+            ["%s: %s\r\n" % (k, v) for k, v in self.cors_headers.items()]
+        ).encode()
+
+        # Cache the OPTIONS response entirely since it never changes.
+        # O preflight vira um blob completo (headers CORS + fim da
+        # resposta) no slot _prebuilt: o writer só prepende status/Date/
+        # Connection e faz um único write, sem formatação por request
         self._options_response = Response("", 204)
-        self._options_response.headers.update(self.cors_headers)
+        self._options_response._prebuilt = self._cors_blob + b"Content-Length: 0\r\n\r\n"
 
     async def __call__(self, request, next_handler):
-        # Fast path for preflight requests
+        # Fast path for preflight requests (clone: blob compartilhado,
+        # slots de header por request — outro middleware pode anexar
+        # headers sem mutar o template)
         if request.method == "OPTIONS":
-            return self._options_response
+            return self._options_response._clone()
 
         # Process request
         response = await next_handler(request)
 
-        # Merge CORS headers into the response headers
-        # .update() is generally implemented efficiently in C for MicroPython
-        response.headers.update(self.cors_headers)
+        # Anexa o blob pré-codificado; o check cobre responses singleton
+        # que já passaram por aqui (e não sobrescreve um blob de outro
+        # middleware — nesse caso raro concatena uma única vez)
+        raw = response._raw_headers
+        if raw is None:
+            response._raw_headers = self._cors_blob
+        elif raw is not self._cors_blob and not raw.endswith(self._cors_blob):
+            response._raw_headers = raw + self._cors_blob
         return response
 
 
 class LoggingMiddleware:
     """Middleware for detailed request logging: Date, IP, Method, Path, Status, Duration."""
 
-    def __init__(self, logger: Logger = None):
+    def __init__(self, logger: Logger = None, enabled: bool = True):
         self.logger = logger or ConsoleLogger()
+        self.enabled = enabled
+        # Timestamp memoizado por segundo: sob carga, requests no mesmo
+        # segundo reusam a string, pulando o localtime() + formato
+        self._last_ts_sec = -1
+        self._last_ts_str = ""
 
     async def __call__(self, request, next_handler):
+        # Short-circuit when disabled: no timestamp/duration formatting
+        # work is paid per request just to be thrown away
+        if not self.enabled:
+            return await next_handler(request)
+
         start = time.ticks_us()
         response = await next_handler(request)
         duration = time.ticks_diff(time.ticks_us(), start)
 
         # Format duration logic inline for performance
-        if duration < 1000:
-            time_str = f"{duration}us"
-        elif duration < 1000000:
-            time_str = f"{duration / 1000:.3f}ms"
+        if duration < _US_MS:
+            time_str = "%dus" % duration
+        elif duration < _US_S:
+            time_str = "%.3fms" % (duration / _US_MS)
         else:
-            time_str = f"{duration / 1000000:.3f}s"
+            time_str = "%.3fs" % (duration / _US_S)
 
-        # Get simplified timestamp
-        # MicroPython returns 8-tuple, CPython returns 9-tuple. Slicing maintains compatibility.
-        y, m, d, H, M, S = time.localtime()[:6]
+        # Get simplified timestamp (regenerado só quando o segundo muda)
+        sec = int(time.time())
+        if sec != self._last_ts_sec:
+            # MicroPython returns 8-tuple, CPython returns 9-tuple.
+            # Slicing maintains compatibility.
+            y, m, d, H, M, S = time.localtime()[:6]
+            self._last_ts_str = _TS_FMT % (d, m, y, H, M, S)
+            self._last_ts_sec = sec
 
-        # f-string formatting is efficient in recent MicroPython versions
         self.logger.log(
-            f"{d:02d}/{m:02d}/{y:04d} {H:02d}:{M:02d}:{S:02d} | "
-            f"{request.ip} | {request.method} {request.path} | "
-            f"{response.status} | {time_str}"
+            _LOG_FMT % (self._last_ts_str, request.ip, request.method,
+                        request.path, response.status, time_str)
         )
 
         return response
@@ -88,7 +128,11 @@ class MiddlewarePipeline:
         return chain
 
     def _wrap(self, middleware, next_handler):
-        async def wrapped_middleware(request):
-            return await middleware(request, next_handler)
+        # Adapter síncrono: devolve a coroutine do middleware direto para
+        # quem vai aguardá-la, sem criar um frame de coroutine extra por
+        # camada em cada request (a cadeia em si já é construída uma única
+        # vez e cacheada pelo servidor)
+        def wrapped_middleware(request):
+            return middleware(request, next_handler)
 
         return wrapped_middleware
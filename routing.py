@@ -1,98 +1,107 @@
+from micropython import const
+
+# Nós das tries como listas de shape fixo indexadas por const: um load de
+# índice inteiro por campo no lugar de hash + probe de dict por chave
+_H = const(0)   # handler
+_C = const(1)   # filhos estáticos {segmento: nó}
+_P = const(2)   # filho paramétrico (<param>)
+_PN = const(3)  # nome do parâmetro
+
+
+def _iter_parts(path: str):
+    """Itera os segmentos do path dirigido por find() com limites.
+
+    Uma fatia por segmento, sem a lista do split nem as fatias
+    intermediárias do strip de '/' — o scan fica em C.
+    """
+    n = len(path)
+    i = 1 if n and path[0] == "/" else 0
+    if n and path[-1] == "/":
+        n -= 1
+    while i < n:
+        j = path.find("/", i, n)
+        if j < 0:
+            j = n
+        yield path[i:j]
+        i = j + 1
+
+
 class _StaticTrie:
     def __init__(self):
-        self.root = {"h": None, "c": {}}
+        self.root = [None, {}]
 
     def add(self, prefix: str, handler):
         node = self.root
-        for part in self._parts(prefix):
-            children = node["c"]
+        for part in _iter_parts(prefix):
+            children = node[_C]
             if part not in children:
-                children[part] = {"h": None, "c": {}}
+                children[part] = [None, {}]
             node = children[part]
-        node["h"] = handler
+        node[_H] = handler
 
     def match(self, path: str):
         node = self.root
         last_handler = None
-        for part in self._parts(path):
-            children = node.get("c")
+        for part in _iter_parts(path):
+            children = node[_C]
             if part not in children:
                 break
             node = children[part]
-            if node.get("h"):
-                last_handler = node["h"]
+            if node[_H]:
+                last_handler = node[_H]
         return last_handler
 
-    def _parts(self, path: str) -> list:
-        if not path or path == "/":
-            return []
-        if path[0] == "/":
-            path = path[1:]
-        if path.endswith("/"):
-            path = path[:-1]
-        return path.split("/") if path else []
-
 
 class _RouteTrie:
     def __init__(self):
-        self.root = {"h": None, "c": {}, "p": None, "pn": None}
+        self.root = [None, {}, None, None]
+        # Profundidade máxima registrada: paths com mais segmentos nunca
+        # casam e o match pula a descida inteira
+        self._max_depth = 0
 
     def add(self, pattern: str, handler):
         node = self.root
-        for part in self._parts(pattern):
+        depth = 0
+        for part in _iter_parts(pattern):
+            depth += 1
             if part.startswith("<") and part.endswith(">"):
                 param_name = part[1:-1]
-                if node.get("p") is None:
-                    node["p"] = {"h": None, "c": {}, "p": None, "pn": None}
-                node["pn"] = param_name
-                node = node["p"]
+                if node[_P] is None:
+                    node[_P] = [None, {}, None, None]
+                node[_PN] = param_name
+                node = node[_P]
             else:
-                children = node["c"]
+                children = node[_C]
                 if part not in children:
-                    children[part] = {"h": None, "c": {}, "p": None, "pn": None}
+                    children[part] = [None, {}, None, None]
                 node = children[part]
-        node["h"] = handler
+        node[_H] = handler
+        if depth > self._max_depth:
+            self._max_depth = depth
 
     def match(self, path: str):
         node = self.root
         params = None
 
-        if not path or path == "/":
-            parts = []
-        else:
-            if path[0] == "/":
-                path = path[1:]
-            if path.endswith("/"):
-                path = path[:-1]
-            parts = path.split("/") if path else []
-
-        for part in parts:
-            children = node["c"]
+        for part in _iter_parts(path):
+            children = node[_C]
             if part in children:
                 node = children[part]
-            elif node["p"] is not None:
-                param_name = node["pn"]
+            elif node[_P] is not None:
+                param_name = node[_PN]
                 if param_name is not None:
                     if params is None:
                         params = {}
                     params[param_name] = part
-                node = node["p"]
+                node = node[_P]
             else:
                 return None
 
-        if node["h"]:
-            return node["h"], params or {}
+        if node[_H]:
+            # params fica None em rotas dinâmicas sem segmento <param>
+            return node[_H], params
         return None
 
-    def _parts(self, path: str) -> list:
-        if not path or path == "/":
-            return []
-        if path[0] == "/":
-            path = path[1:]
-        if path.endswith("/"):
-            path = path[:-1]
-        return path.split("/") if path else []
-
 
 class RouterInterface:
     """Implementa o padrão Strategy para roteamento."""
@@ -117,10 +126,19 @@ class Router(RouterInterface):
         self._static_trie = _StaticTrie()
         self._dyn_tries = {}
 
-        # Proteção OOM: Cache limitado
+        # Proteção OOM: Cache limitado. O set dá a membership O(1); a
+        # lista paralela guarda a ordem de inserção para expulsão FIFO
         self._not_found_cache = set()
+        self._nf_order = []
         self._cache_size = not_found_cache_size
 
+        # Cache de matches positivos (method, path) -> handler: em APIs
+        # típicas poucos paths dominam e o match vira um get de dict. Só
+        # rotas sem params entram — o dict de params é mutável e por
+        # request, não pode ser compartilhado
+        self._hit_cache = {}
+        self._hit_cache_size = 128
+
     def add(self, method: str, path: str, handler):
         if "<" in path and ">" in path:
             trie = self._dyn_tries.get(method)
@@ -130,46 +148,60 @@ class Router(RouterInterface):
             trie.add(path, handler)
         else:
             self.route_map[(method, path)] = handler
+        self._hit_cache.clear()  # rota nova pode mudar matches cacheados
 
     def add_static(self, url_path: str, handler):
         self.static_routes.append((url_path, handler))
         self._static_trie.add(url_path, handler)
+        self._hit_cache.clear()
 
     def match(self, method: str, path: str):
+        # 0. Hot path: match já resolvido antes (sem params)
+        handler = self._hit_cache.get((method, path))
+        if handler is not None:
+            return handler, None
+
         # 1. Checagem rápida no cache de 404 (Proteção de CPU)
         if path in self._not_found_cache:
             return None, None
 
         handler, params = self._internal_match(method, path)
         if handler:
+            if params is None:
+                cache = self._hit_cache
+                if len(cache) >= self._hit_cache_size:
+                    # Estratégia simples, como no cache de 404: descarta
+                    # uma entrada arbitrária
+                    cache.pop(next(iter(cache)))
+                cache[(method, path)] = handler
             return handler, params
 
         # Not found - Adiciona ao cache com proteção de Memória
         if len(self._not_found_cache) >= self._cache_size:
-            # Estratégia simples: remove um arbitrário
-            try:
-                self._not_found_cache.pop()
-            except KeyError:
-                pass
+            # FIFO determinístico: set.pop() descartava um elemento
+            # arbitrário e podia reexpulsar repetidamente paths ausentes
+            # quentes sob tráfego pesado de misses
+            self._not_found_cache.discard(self._nf_order.pop(0))
 
         self._not_found_cache.add(path)
+        self._nf_order.append(path)
         return None, None
 
     def _internal_match(self, method: str, path: str):
-        # 2. Exact match
+        # 2. Exact match (params None: rota sem parâmetros não aloca dict)
         handler = self.route_map.get((method, path))
-        params = {}
         if handler:
-            return handler, params
+            return handler, None
 
         # 3. Static match
         handler = self._static_trie.match(path)
         if handler:
-            return handler, params
+            return handler, None
 
-        # 4. Dynamic match
+        # 4. Dynamic match. count() roda em C: paths mais fundos que a
+        # trie registrada nunca casam, então nem desce nela
         trie = self._dyn_tries.get(method)
-        if trie is not None:
+        if trie is not None and path.count("/") <= trie._max_depth + 1:
             matched = trie.match(path)
             if matched is not None:
                 return matched
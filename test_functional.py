@@ -38,6 +38,20 @@ class MockStreamReader:
             self.pos += 1
         return self.data[start:]
 
+    async def readinto(self, buf):
+        # Mesmo caminho usado pelo servidor no uasyncio: preenche o
+        # buffer passado e retorna a contagem (0 = EOF)
+        if self.pos >= len(self.data):
+            return 0
+        n = len(buf)
+        remaining = len(self.data) - self.pos
+        if remaining < n:
+            n = remaining
+        buf[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        await asyncio.sleep(0)
+        return n
+
 
 class MockStreamWriter:
     def __init__(self):
@@ -68,11 +82,25 @@ class MockStreamWriter:
             return bytes(self.data).decode()
 
 
+async def http_exchange(app, raw):
+    """Roda uma conexão inteira pelo caminho real (_handle_request).
+
+    O reader entrega `raw` como o socket entregaria (readinto em blocos)
+    e o retorno é tudo que o servidor escreveu na conexão.
+    """
+    reader = MockStreamReader(raw)
+    writer = MockStreamWriter()
+    # wait_for: um hang no parse do head vira falha de teste, não deadlock
+    await asyncio.wait_for(app._handle_request(reader, writer), 5)
+    await asyncio.sleep(0)  # deixa o _wait_closed em background rodar
+    return writer.get_response()
+
+
 async def main():
     """Main test function"""
 
     # Test 1: HTTP Date Header
-    print("\n[1/7] Testing HTTP-date format (RFC 7231)...")
+    print("\n[1/12] Testing HTTP-date format (RFC 7231)...")
     try:
         date = _format_http_date()
         parts = date.split()
@@ -84,7 +112,7 @@ async def main():
         return False
 
     # Test 2: Response Headers
-    print("\n[2/7] Testing response headers (Date, Server, Connection)...")
+    print("\n[2/12] Testing response headers (Date, Server, Connection)...")
     try:
         app = MicroServer(port=8080)
 
@@ -115,7 +143,7 @@ async def main():
         return False
 
     # Test 3: Connection close header
-    print("\n[3/7] Testing Connection: close header...")
+    print("\n[3/12] Testing Connection: close header...")
     try:
         writer = MockStreamWriter()
         response = Response.plain("test")
@@ -129,26 +157,22 @@ async def main():
         print(f"✗ Failed: {e}")
         return False
 
-    # Test 4: Semaphore-based connection limiting
-    print("\n[4/7] Testing semaphore-based connection limiting...")
+    # Test 4: Counter-based connection limiting
+    print("\n[4/12] Testing counter-based connection limiting...")
     try:
         app = MicroServer(port=8080, max_conns=3)
         assert app.max_conns == 3
-        assert hasattr(app._conn_semaphore, 'locked')
+        assert app.burst_conns >= app.max_conns, "Burst limit below max_conns"
         assert app._active_connections == 0
 
-        # Simulate acquiring connections
-        initial_locked = app._conn_semaphore.locked()
-        assert not initial_locked, "Semaphore should not be locked initially"
-
-        print(f"✓ Semaphore initialized (max_conns={app.max_conns})")
+        print(f"✓ Admission counter initialized (max_conns={app.max_conns}, burst_conns={app.burst_conns})")
         print(f"✓ Active connections counter: {app._active_connections}")
     except Exception as e:
         print(f"✗ Failed: {e}")
         return False
 
     # Test 5: Cached middleware pipeline
-    print("\n[5/7] Testing cached middleware pipeline...")
+    print("\n[5/12] Testing cached middleware pipeline...")
     try:
         app = MicroServer(port=8080)
 
@@ -179,7 +203,7 @@ async def main():
         return False
 
     # Test 6: WebSocket ping/pong initialization
-    print("\n[6/7] Testing WebSocket ping/pong attributes...")
+    print("\n[6/12] Testing WebSocket ping/pong attributes...")
     try:
         reader = MockStreamReader(b"")
         writer = MockStreamWriter()
@@ -199,7 +223,7 @@ async def main():
         return False
 
     # Test 7: Static file Cache-Control
-    print("\n[7/7] Testing static file Cache-Control header...")
+    print("\n[7/12] Testing static file Cache-Control header...")
     try:
         import os
 
@@ -247,6 +271,161 @@ async def main():
         print(f"✗ Failed: {e}")
         sys.print_exception(e)
 
+    # Test 8: Full request path - request without any header
+    print("\n[8/12] Testing full request path (headerless request)...")
+    try:
+        app = MicroServer(port=8080)
+
+        @app.get("/ping")
+        async def ping(req):
+            return Response.json({"pong": True})
+
+        # Request sem nenhum header: o scan do head precisa achar o
+        # separador mesmo sem linhas de header (regressão: hang no parse)
+        output = await http_exchange(app, b"GET /ping HTTP/1.1\r\n\r\n")
+        assert output.startswith("HTTP/1.1 200 OK\r\n"), "Wrong status line"
+        assert '{"pong":true}' in output, "Missing JSON body"
+        assert "Connection: close" in output, "Headerless request should close"
+        print("✓ Headerless request served (200 + Connection: close, no hang)")
+    except Exception as e:
+        print(f"✗ Failed: {e}")
+        sys.print_exception(e)
+        return False
+
+    # Test 9: Keep-alive with pipelined requests carrying bodies
+    print("\n[9/12] Testing keep-alive with pipelined bodies...")
+    try:
+        app = MicroServer(port=8080)
+
+        @app.post("/echo")
+        async def echo(req):
+            # body pode ser memoryview sobre o buffer da conexão: copia
+            return Response.plain(bytes(req.body))
+
+        # Os dois requests chegam num bloco só: o scan do head deixa o
+        # body do primeiro e o segundo request inteiro em `pending`
+        raw = (
+            b"POST /echo HTTP/1.1\r\nConnection: keep-alive\r\nContent-Length: 5\r\n\r\nhello"
+            b"POST /echo HTTP/1.1\r\nConnection: keep-alive\r\nContent-Length: 5\r\n\r\nworld"
+        )
+        output = await http_exchange(app, raw)
+        assert output.count("HTTP/1.1 200 OK") == 2, "Expected two responses"
+        assert "hello" in output, "First body lost in handoff"
+        assert "world" in output, "Second pipelined body lost"
+        assert "Connection: keep-alive" in output, "Missing keep-alive"
+        assert "Keep-Alive: timeout=" in output, "Missing Keep-Alive header"
+        print("✓ Two pipelined POSTs served on one connection")
+        print("  - Body handoff from head scan buffer ✓")
+        print("  - Keep-Alive headers present ✓")
+    except Exception as e:
+        print(f"✗ Failed: {e}")
+        sys.print_exception(e)
+        return False
+
+    # Test 10: HEAD suppresses the body but keeps Content-Length
+    print("\n[10/12] Testing HEAD body suppression...")
+    try:
+        output = await http_exchange(app, b"HEAD /echo HTTP/1.1\r\n\r\n")
+        # rota POST: HEAD roteia como GET e /echo não tem GET -> 404 sem body
+        head, sep, rest = output.partition("\r\n\r\n")
+        assert output.startswith("HTTP/1.1 404"), "HEAD should route as GET"
+        assert rest == "", "HEAD must not carry a body"
+        assert "Content-Length: " in head, "Content-Length must survive HEAD"
+
+        @app.get("/info")
+        async def info(req):
+            return Response.json({"v": 1})
+
+        output = await http_exchange(app, b"HEAD /info HTTP/1.1\r\n\r\n")
+        head, sep, rest = output.partition("\r\n\r\n")
+        assert output.startswith("HTTP/1.1 200 OK\r\n"), "Wrong status line"
+        assert rest == "", "HEAD must not carry a body"
+        assert "Content-Length: 7" in head, "Wrong Content-Length"  # {"v":1}
+        print("✓ HEAD returns headers only")
+        print("  - 200 with Content-Length, empty body ✓")
+        print("  - 404 canned response also body-less ✓")
+    except Exception as e:
+        print(f"✗ Failed: {e}")
+        sys.print_exception(e)
+        return False
+
+    # Test 11: Static precache + conditional GET (If-None-Match -> 304)
+    print("\n[11/12] Testing static precache and If-None-Match -> 304...")
+    try:
+        import os
+
+        app = MicroServer(port=8080)
+        test_dir = "/tmp/ms_etag_test"
+        try:
+            os.mkdir(test_dir)
+        except OSError:
+            pass  # já existe
+        test_file = test_dir + "/cached.txt"
+        with open(test_file, "w") as f:
+            f.write("cached body")
+
+        try:
+            app.mount_static("/static", test_dir, max_age=60, precache=1024)
+
+            output = await http_exchange(app, b"GET /static/cached.txt HTTP/1.1\r\n\r\n")
+            assert output.startswith("HTTP/1.1 200 OK\r\n"), "Wrong status line"
+            assert "cached body" in output, "Missing file body"
+            assert "ETag: " in output, "Missing ETag header"
+            assert "Cache-Control: public, max-age=60" in output, "Missing Cache-Control"
+
+            etag = output.split("ETag: ")[1].split("\r\n")[0]
+            cond = ("GET /static/cached.txt HTTP/1.1\r\nIf-None-Match: %s\r\n\r\n" % etag).encode()
+            output = await http_exchange(app, cond)
+            assert output.startswith("HTTP/1.1 304"), "Expected 304 Not Modified"
+            assert "cached body" not in output, "304 must not carry the body"
+            print("✓ Precached static served with ETag + Cache-Control")
+            print(f"  - ETag: {etag} ✓")
+            print("  - If-None-Match revalidation -> 304 ✓")
+        finally:
+            try:
+                os.remove(test_file)
+            except:
+                pass
+    except Exception as e:
+        print(f"✗ Failed: {e}")
+        sys.print_exception(e)
+        return False
+
+    # Test 12: Reject paths (400 / 413 / 431) and header-name validation
+    print("\n[12/12] Testing malformed-request reject paths...")
+    try:
+        app = MicroServer(port=8080)
+
+        output = await http_exchange(
+            app, b"POST /x HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        assert output.startswith("HTTP/1.1 400"), "Bad Content-Length -> 400"
+
+        output = await http_exchange(
+            app, b"POST /x HTTP/1.1\r\nContent-Length: 2000000\r\n\r\n")
+        assert output.startswith("HTTP/1.1 413"), "Oversized body -> 413"
+
+        big = b"GET / HTTP/1.1\r\nX-Big: " + b"a" * 20000 + b"\r\n\r\n"
+        output = await http_exchange(app, big)
+        assert output.startswith("HTTP/1.1 431"), "Oversized head -> 431"
+
+        # Nome de header com OWS antes do ':' é descartado (RFC 7230
+        # §3.2.4: ambiguidade de request smuggling)
+        h = {}
+        assert app._store_header(b"Host : evil.example", h) is False
+        assert h == {}, "Smuggling-ambiguous header must not be stored"
+        assert app._store_header(b"Host: ok.example", h) is True
+        assert h == {"host": "ok.example"}
+
+        print("✓ Reject paths answered with canned responses")
+        print("  - Invalid Content-Length -> 400 ✓")
+        print("  - Content-Length over limit -> 413 ✓")
+        print("  - Head over size cap -> 431 ✓")
+        print("  - OWS before header colon rejected ✓")
+    except Exception as e:
+        print(f"✗ Failed: {e}")
+        sys.print_exception(e)
+        return False
+
     # Summary
     print("\n" + "=" * 60)
     print("✓ ALL FUNCTIONAL TESTS PASSED!")
@@ -258,10 +437,13 @@ async def main():
     print("    - Server header")
     print("    - Connection: keep-alive / close")
     print("    - Keep-Alive: timeout, max")
-    print("  ✓ Connection limiting (semaphore)")
+    print("  ✓ Connection limiting (counter-based, burst-aware)")
     print("  ✓ Middleware pipeline caching")
     print("  ✓ WebSocket ping/pong setup")
     print("  ✓ Static file Cache-Control")
+    print("  ✓ Full request path (headerless, pipelined bodies, HEAD)")
+    print("  ✓ Static precache + If-None-Match -> 304")
+    print("  ✓ Reject paths (400 / 413 / 431, header-name validation)")
 
     print("\n✅ MicroServer v1.0.0 is READY for ESP32 deployment!")
 
@@ -50,10 +50,10 @@ try:
     print(f"  - Body timeout: {app.body_timeout}s")
 
     print("\n3. Testing HTTP configuration...")
-    assert hasattr(app, '_conn_semaphore'), "Missing semaphore"
     assert hasattr(app, '_active_connections'), "Missing active connections counter"
+    assert app.burst_conns >= app.max_conns, "Burst limit below max_conns"
     assert hasattr(app, '_handler'), "Missing cached handler"
-    print("✓ Connection limiting (semaphore-based)")
+    print("✓ Connection limiting (counter-based, burst-aware)")
     print("✓ Cached middleware pipeline")
     print("✓ HTTP keep-alive support")
 
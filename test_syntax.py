@@ -113,14 +113,14 @@ try:
     assert app.keep_alive_timeout == 5
     assert app.max_keep_alive_requests == 100
     assert app.body_timeout == 30
-    assert hasattr(app, '_conn_semaphore'), "Missing semaphore"
     assert hasattr(app, '_active_connections'), "Missing active connections counter"
+    assert app.burst_conns >= app.max_conns, "Burst limit below max_conns"
     assert hasattr(app, '_handler'), "Missing cached handler"
 
     print(f"✓ microserver.py: Server initialized ({app.server_name})")
     print(f"  - Keep-alive: {app.keep_alive_timeout}s timeout, {app.max_keep_alive_requests} max requests")
     print(f"  - Body timeout: {app.body_timeout}s (Slowloris protection)")
-    print(f"  - Semaphore-based connection limiting")
+    print(f"  - Counter-based connection limiting (burst-aware)")
     print(f"  - Cached middleware pipeline")
 
 except Exception as e:
@@ -137,7 +137,7 @@ print("=" * 60)
 print("\n📋 Verified v1.0.0 Features:")
 print("  ✓ HTTP RFC 7230-7235 compliance (Date, Server headers)")
 print("  ✓ HTTP Keep-Alive support (configurable timeouts)")
-print("  ✓ Atomic connection limiting (asyncio.Semaphore)")
+print("  ✓ Counter-based connection limiting (burst-aware)")
 print("  ✓ DoS protection (header/body limits)")
 print("  ✓ WebSocket RFC 6455 compliance (ping/pong)")
 print("  ✓ Cached middleware pipeline")